@@ -103,7 +103,7 @@ def discover_delimiter(filepath, encoding):
         linecount = 0
         samplelines = []
 
-        with codecs.open(filepath, "rU", encoding=encoding) as file:
+        with codecs.open(filepath, "r", encoding=encoding) as file:
             csvreader = csv.reader(file, delimiter=delim)
             # print('\n-------------------\n')
             line = next(csvreader, None)
@@ -211,7 +211,7 @@ def discover_delimiter(filepath, encoding):
 
 
 def discard_file(filepath, encoding):
-    with codecs.open(filepath, "rU", encoding=encoding) as fp:
+    with codecs.open(filepath, "r", encoding=encoding) as fp:
         firstline = fp.readline()
         while len(firstline.strip()) == 0:
             firstline = fp.readline()
@@ -294,53 +294,35 @@ def detect_encoding(filepath):
     return result
 
 
+def normalized_cell(value):
+    # blank strings are missing values, the others are transliterated to ASCII
+    if type(value) is not str:
+        return value
+    if value == "" or value.isspace():
+        return np.nan
+    if value.isascii():
+        return value
+    return unidecode(value)
+
+
 def merged_df(failure, all_csv_tuples):
-    dataframes = []
-    if failure == None and all_csv_tuples != None and len(all_csv_tuples) > 0:
-        start_index = 0
-        line_index = 0
-        csv_tuples = [all_csv_tuples[0]]
+    # one frame for all lines, lines narrower than the widest are padded with
+    # NaN on the right as appending the blocks of equally wide lines did; the
+    # values are normalized line by line as they are gathered, instead of
+    # with a regex replace and an applymap over the whole frame
+    rows = []
+    if failure == None and all_csv_tuples != None and len(all_csv_tuples) >= 1:
         num_fields = len(all_csv_tuples[0])
-        dataframes = []
-        empty_lines = []
-        line_index += 1
-        while line_index < len(all_csv_tuples):
-            csv_tuple = all_csv_tuples[line_index]
+        for csv_tuple in all_csv_tuples:
             if len(csv_tuple) == 0:
                 csv_tuple = ["" for i in range(0, num_fields)]
-                empty_lines.append(line_index)
-
-            if len(csv_tuple) == num_fields:
-                csv_tuples.append(csv_tuple)
-                end_index = line_index + 1
-            else:
-                end_index = line_index
-
-            if len(csv_tuple) != num_fields or (
-                len(csv_tuple) == num_fields and line_index + 1 == len(all_csv_tuples)
-            ):
-
-                dataframe = pd.DataFrame(csv_tuples)
-                dataframe.index = list(range(start_index, end_index))
-                dataframe.fillna(value=np.nan, inplace=True)
-                dataframe.replace(to_replace=[None], value=np.nan, inplace=True)
-                dataframe = dataframe.replace(r"^\s*$", np.nan, regex=True)
-
-                if start_index - 1 in empty_lines or len(dataframes) == 0:
-                    dataframes.append(dataframe)
-                else:
-                    dataframes[-1] = dataframes[-1].append(dataframe)
-
-                start_index = end_index
-                if start_index < len(all_csv_tuples):
-                    csv_tuples = [csv_tuple]
-                    num_fields = len(csv_tuple)
-
-            line_index += 1
+            num_fields = len(csv_tuple)
+            rows.append([normalized_cell(value) for value in csv_tuple])
 
     dataframe = pd.DataFrame()
-    for df in dataframes:
-        dataframe = dataframe.append(df)
+    if len(rows) > 0:
+        dataframe = pd.DataFrame(rows)
+        dataframe.fillna(value=np.nan, inplace=True)
 
     dataframe.reset_index(drop=True)
 
@@ -355,7 +337,6 @@ def merged_df(failure, all_csv_tuples):
             break
 
     dataframe.columns = list(range(0, dataframe.shape[1]))
-    dataframe = dataframe.apply(decode_value, axis=1)
     return dataframe
 
 
@@ -380,19 +361,18 @@ def get_dataframe(filepath, max_lines):
         if failure == None:
             try:
                 all_csv_tuples = []
-                with codecs.open(filepath, "rU", encoding=discovered_encoding) as f:
-                    chunk = f.read()
-                    if chunk:
-                        for line in csv.reader(
-                            chunk.split("\n"),
-                            quotechar='"',
-                            delimiter=discovered_delimiter,
-                            skipinitialspace=True,
-                        ):
-                            num_lines += 1
-                            if len(line) == 0 or sum(len(s.strip()) for s in line) == 0:
-                                blanklines.append(num_lines - 1)
-                            all_csv_tuples.append(line)
+                with open(filepath, "r", encoding=discovered_encoding, newline="") as f:
+                    # stream the lines, the file is never held in memory whole
+                    for line in csv.reader(
+                        f,
+                        quotechar='"',
+                        delimiter=discovered_delimiter,
+                        skipinitialspace=True,
+                    ):
+                        num_lines += 1
+                        if not any(s.strip() for s in line):
+                            blanklines.append(num_lines - 1)
+                        all_csv_tuples.append(line)
             except Exception as e:
                 print(f"file_utilities.get_dataframe:{e}, filepath:{filepath}")
 
@@ -492,7 +472,7 @@ def sample_file(filepath, max_batch=100):
         batch = []
         lineindex = -1
 
-        with codecs.open(filepath, "rU", encoding=discovered_encoding) as f:
+        with codecs.open(filepath, "r", encoding=discovered_encoding) as f:
             chunk = f.read(min(size_bytes, 100000))
             if chunk:
                 # google_detected_lang = detect_lang(chunk)
@@ -1,11 +1,42 @@
 import sys
+from functools import lru_cache
+
+import numpy as np
 import pytheas.utilities as utilities
 import pytheas.nb_utilities as nb_util
 import string_utils
 from unidecode import unidecode
 
+try:
+    from numba import njit
+
+    _NUMBA_AVAILABLE = True
+except ImportError:
+    _NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        # numba is optional, fall back to the plain Python loops
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+
+# integers at or above this do not fit the int64 kernel
+_INT64_LIMIT = np.iinfo(np.int64).max
+
+
+def row_text(row_values):
+    # the row events only read the text of each value, rows with the same text
+    # (repeated subheaders, section breaks) share their cached events
+    return tuple(str(value) for value in row_values)
+
 
 def collect_arithmetic_events_on_row(row_values):
+    return list(arithmetic_events_on_row_text(row_text(row_values)))
+
+
+@lru_cache(maxsize=8192)
+def arithmetic_events_on_row_text(row_values):
     events = []
 
     fired, times = integer_sequence_adjacent(row_values)
@@ -22,7 +53,7 @@ def collect_arithmetic_events_on_row(row_values):
         elif times == 2:
             events.append("ADJACENT_ARITHMETIC_SEQUENCE_2")
 
-    return events
+    return tuple(events)
 
 
 def arithmetic_sequence_adjacent(row_values, step_count_k=2):
@@ -101,8 +132,25 @@ def collect_new_rules(row_values):
     return list(events)
 
 
+class RowFeatures(object):
+    """The text of a row as the header events read it, computed once per row."""
+
+    __slots__ = ["values", "stripped", "transliterated", "has_digits"]
+
+    def __init__(self, row_values):
+        self.values = row_values
+        # stripped values, blank where the value is missing
+        self.stripped = [
+            str(value).strip() if str(value).lower() not in ["nan", "none"] else ""
+            for value in row_values
+        ]
+        self.transliterated = [unidecode(value).strip() for value in self.stripped]
+        self.has_digits = any(char.isdigit() for char in "".join(row_values))
+
+
 def collect_events_on_row(row_values):
     events = []
+    row = RowFeatures(row_values)
     fired, times = range_pairs_on_row(row_values)
     if fired == True:
         if times >= 2:
@@ -118,38 +166,34 @@ def collect_events_on_row(row_values):
             events.append("PARTIALLY_REPEATING_VALUES_length_1")
 
     fired = metadata_like_row(
-        row_values
+        row
     )  # row has no digits, at least one value enclosed by parenthesis or contains currency sign
     if fired == True:
         events.append("METADATA_LIKE_ROW")
 
-    fired = consistently_slug_or_snake(row_values)
+    fired = consistently_slug_or_snake(row)
     if fired == True:
         events.append("CONSISTENTLY_SLUG_OR_SNAKE")
 
-    if consistently_upper_case(row_values):
+    if consistently_upper_case(row):
         events.append("CONSISTENTLY_UPPER_CASE")
 
     return events
 
 
-def consistently_upper_case(row_values):
+def consistently_upper_case(row):
     fired = True
-    values = [
-        str(value).strip() if str(value).lower() not in ["nan", "none"] else ""
-        for value in row_values
-    ]
-    for value in values:
-        if unidecode(value).strip().isupper() == False or value == "":
+    for value, transliterated in zip(row.stripped, row.transliterated):
+        if transliterated.isupper() == False or value == "":
             fired = False
             break
     return fired
 
 
-def metadata_like_row(row_values):
+def metadata_like_row(row):
     event_occurred = False
-    if any(char.isdigit() for char in "".join(row_values)) == False:
-        for value in row_values:
+    if row.has_digits == False:
+        for value in row.values:
             if "$" in str(value) or "%" in str(value):
                 event_occurred = True
                 break
@@ -166,6 +210,22 @@ def FindMaxLength(lst):
     return maxList, maxLength
 
 
+@njit(cache=True)
+def _longest_increment_run_nb(numbers, is_integer):
+    # steps in the longest run of adjacent integers that each add one to the
+    # integer before them, 0 when there is no such pair
+    longest = 0
+    run = 0
+    for i in range(len(numbers) - 1):
+        if is_integer[i] and is_integer[i + 1] and numbers[i] + 1 == numbers[i + 1]:
+            run += 1
+            if run > longest:
+                longest = run
+        else:
+            run = 0
+    return longest
+
+
 def integer_sequence_adjacent(row_values):
     event_occurred = False
     step_increment = None
@@ -186,6 +246,20 @@ def integer_sequence_adjacent(row_values):
             else:
                 numeric_values.append(None)
         # input('numeric_values='+str(numeric_values))
+        if _NUMBA_AVAILABLE and all(
+            value == None or value < _INT64_LIMIT for value in numeric_values
+        ):
+            longest_run = _longest_increment_run_nb(
+                np.array(
+                    [0 if value == None else value for value in numeric_values],
+                    dtype=np.int64,
+                ),
+                np.array([value != None for value in numeric_values]),
+            )
+            if longest_run > 0:
+                event_occurred = True
+                step_count = longest_run
+            return event_occurred, step_count
         for i in range(len(numeric_values) - 1):
             if (
                 numeric_values[i] != None
@@ -373,6 +447,15 @@ def multiple_aggregation_values_on_row(row_values):
 
 
 def header_row_with_aggregation_tokens(row_values, arithmetic_sequence_fired):
+    return list(
+        aggregation_token_events_on_row_text(
+            row_text(row_values), arithmetic_sequence_fired == True
+        )
+    )
+
+
+@lru_cache(maxsize=8192)
+def aggregation_token_events_on_row_text(row_values, arithmetic_sequence_fired):
     header_row_with_aggregation_tokens_rules_fired = []
     if aggregation_on_row_wo_numeric(row_values):
         header_row_with_aggregation_tokens_rules_fired.append(
@@ -385,7 +468,7 @@ def header_row_with_aggregation_tokens(row_values, arithmetic_sequence_fired):
     # if multiple_aggregation_values_on_row(row_values):
     #     header_row_with_aggregation_tokens_rules_fired.append("MULTIPLE_AGGREGATION_VALUES_ON_ROW")
 
-    return header_row_with_aggregation_tokens_rules_fired
+    return tuple(header_row_with_aggregation_tokens_rules_fired)
 
 
 def consistently_title_case(row_values):
@@ -402,20 +485,18 @@ def consistently_title_case(row_values):
     return fired
 
 
+# the slug and snake case checks take values already transliterated and stripped
 def consistently_slug_case(row_values):
     fired = True
     slug_case_seen = False
     for value in row_values:
-        if " " in unidecode(value).strip():
+        if " " in value:
             fired = False
             break
-        if (
-            "-" in unidecode(value).strip()
-            and string_utils.is_slug(unidecode(value).strip().lower()) == True
-        ):
+        if "-" in value and string_utils.is_slug(value.lower()) == True:
             slug_case_seen = True
         else:
-            if unidecode(value).strip().isalpha() == False:
+            if value.isalpha() == False:
                 fired = False
                 break
 
@@ -428,11 +509,11 @@ def consistently_snake_case(row_values):
     fired = True
     snake_case_seen = False
     for value in row_values:
-        if " " in unidecode(value).strip():
+        if " " in value:
             fired = False
             break
-        if string_utils.is_snake_case(unidecode(value).strip().lower()) == False:
-            if unidecode(value).strip().isalpha() == False:
+        if string_utils.is_snake_case(value.lower()) == False:
+            if value.isalpha() == False:
                 fired = False
                 break
         else:
@@ -443,19 +524,27 @@ def consistently_snake_case(row_values):
     return fired
 
 
-def consistently_slug_or_snake(row_values):
+def consistently_slug_or_snake(row):
     fired = False
-    values = [
-        str(value).strip() if str(value).lower() not in ["nan", "none"] else ""
-        for value in row_values
-    ]
-
-    if consistently_snake_case(values) or consistently_slug_case(values):
+    if consistently_snake_case(row.transliterated) or consistently_slug_case(
+        row.transliterated
+    ):
         fired = True
 
     return fired
 
 
+@lru_cache(maxsize=65536, typed=True)
+def value_range_tokens(value):
+    # the range tokens of a value, found once for every distinct value of the
+    # frame however many rows and columns it appears on
+    numeric_tokens_new, non_numeric_tokens = nb_util.discover_tokens(value)
+    range_tokens, numeric_tokens, remaining_tokens = nb_util.discover_range_tokens(
+        value, numeric_tokens_new
+    )
+    return tuple(range_tokens)
+
+
 def range_pairs_on_row(row_values):
     range_attributes_counted = 0
     range_pair_event_occurred = False
@@ -463,10 +552,7 @@ def range_pairs_on_row(row_values):
     row_value_ranges = []
 
     for value_idx, value in enumerate(row_values):
-        numeric_tokens_new, non_numeric_tokens = nb_util.discover_tokens(value)
-        range_tokens, numeric_tokens, remaining_tokens = nb_util.discover_range_tokens(
-            value, numeric_tokens_new
-        )
+        range_tokens = value_range_tokens(value)
         row_value_ranges.append(range_tokens)
 
         if len(range_tokens) > 0:
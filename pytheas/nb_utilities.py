@@ -3,6 +3,7 @@ import pandas as pd
 import string
 
 import copy
+from functools import lru_cache
 
 # import regex
 import pandas as pd
@@ -444,16 +445,42 @@ def dzs_numbs(x, regx=regx):  # ds = detect and zeros-shave
         yield (mat.group(), "".join(mat.groups("")), mat.groups(""))
 
 
+# numeric tokens and the range phrases built around them are searched as
+# patterns, far more distinct ones than the re module keeps compiled
+compiled_pattern = lru_cache(maxsize=4096)(re.compile)
+leading_digit_group = re.compile(r"^[1-9]\d{1,2}$")
+# numeric tokens made of these characters are plain regex text, with no group,
+# alternation or quantifier that could change the phrase they are set in
+literal_token_chars = frozenset("0123456789.,-eE")
+digit_group = re.compile(r"^\d{3}$")
+
+
+def open_phrase_matches(range_phrase, value):
+    # the phrase with every token left open (matching anything) compiles once
+    # per phrase; a value it does not match cannot match the phrase with any
+    # literal token, so those phrases are never compiled for their tokens
+    return (
+        compiled_pattern(range_phrase.replace("REGEX_TKN", "(?s:.*)")).search(value)
+        is not None
+    )
+
+
+def literal_tokens(*tokens):
+    return all(literal_token_chars.issuperset(token) for token in tokens)
+
+
 def dzs_numbs2(x, regx=regx):  # ds = detect and zeros-shave
-    if not regx.findall(x):
-        # yield ('No match,', 'No catched string,', 'No groups.')
-        yield (None, None, None)
+    matched = False
     for mat in regx.finditer(x):
+        matched = True
         yield (
             mat.group(),
             "".join(("0" if n.startswith(".") else "") + n for n in mat.groups("")),
             mat.groups(""),
         )
+    if not matched:
+        # yield ('No match,', 'No catched string,', 'No groups.')
+        yield (None, None, None)
 
 
 def test_discover_numeric_tokens():
@@ -522,7 +549,8 @@ def discover_tokens(input_value):
             token_to_stridx = {}
             for tok_idx, numeric_tok in enumerate(numeric_tokens):
                 occurence_index_pairs = [
-                    (m.start(), m.end()) for m in re.finditer(numeric_tok, input_value)
+                    (m.start(), m.end())
+                    for m in compiled_pattern(numeric_tok).finditer(input_value)
                 ]
 
                 i = 0
@@ -555,10 +583,10 @@ def discover_tokens(input_value):
                     ):
                         if (
                             first_flag == True
-                            and re.match(r"^[1-9]\d{1,2}$", numeric_tok)
+                            and leading_digit_group.match(numeric_tok)
                         ) or (
                             first_flag == False
-                            and re.match(r"^\d{3}$", numeric_tokens[tok_idx + 1])
+                            and digit_group.match(numeric_tokens[tok_idx + 1])
                         ):
                             numeric_tok = (
                                 numeric_tok
@@ -579,7 +607,7 @@ def discover_tokens(input_value):
 
             if len(numeric_tokens_new) > 0:
                 for token in numeric_tokens_new:
-                    m = re.search(token, value)
+                    m = compiled_pattern(token).search(value)
                     try:
                         value = (
                             value[: m.span()[0]] + " " + value[m.span()[1] :]
@@ -733,10 +761,14 @@ def discover_range_tokens(value, numeric_tokens):
                     ) not in available_numeric_token_pairs:
                         continue
 
+                    if literal_tokens(
+                        numeric_token1, numeric_token2
+                    ) and not open_phrase_matches(range_phrase, snipped_value.lower()):
+                        continue
                     phrase = range_phrase.replace("REGEX_TKN", numeric_token1, 1)
                     phrase = phrase.replace("REGEX_TKN", numeric_token2, 2)
 
-                    m = re.search(phrase, snipped_value.lower())
+                    m = compiled_pattern(phrase).search(snipped_value.lower())
                     if not m:
                         continue
                     phrase_start_idx = m.span()[0]
@@ -756,12 +788,9 @@ def discover_range_tokens(value, numeric_tokens):
                                     available_numeric_token_pairs.remove(
                                         (numeric_token1, numeric_token2)
                                     )
-                                    snipped_value = re.sub(
-                                        "(?i)" + phrase_found,
-                                        " ",
-                                        snipped_value,
-                                        flags=re.I,
-                                    )
+                                    snipped_value = compiled_pattern(
+                                        "(?i)" + phrase_found, re.I
+                                    ).sub(" ", snipped_value)
                                     continue
 
                             # if (len(numeric_token1)== 2 and len(numeric_token2)==2) and int(numeric_token1) > int(numeric_token2):
@@ -776,12 +805,9 @@ def discover_range_tokens(value, numeric_tokens):
                                 available_numeric_token_pairs.remove(
                                     (numeric_token1, numeric_token2)
                                 )
-                                snipped_value = re.sub(
-                                    "(?i)" + phrase_found,
-                                    " ",
-                                    snipped_value,
-                                    flags=re.I,
-                                )
+                                snipped_value = compiled_pattern(
+                                    "(?i)" + phrase_found, re.I
+                                ).sub(" ", snipped_value)
                                 continue
                             if (
                                 phrase_end_idx < len(value)
@@ -790,18 +816,15 @@ def discover_range_tokens(value, numeric_tokens):
                                 available_numeric_token_pairs.remove(
                                     (numeric_token1, numeric_token2)
                                 )
-                                snipped_value = re.sub(
-                                    "(?i)" + phrase_found,
-                                    " ",
-                                    snipped_value,
-                                    flags=re.I,
-                                )
+                                snipped_value = compiled_pattern(
+                                    "(?i)" + phrase_found, re.I
+                                ).sub(" ", snipped_value)
                                 continue
 
                         out_range_tokens.append((phrase_found, range_phrase))
-                        snipped_value = re.sub(
-                            "(?i)" + phrase_found, " ", snipped_value, flags=re.I
-                        )
+                        snipped_value = compiled_pattern(
+                            "(?i)" + phrase_found, re.I
+                        ).sub(" ", snipped_value)
                         if numeric_token1 in out_numeric_tokens:
                             out_numeric_tokens.remove(str(numeric_token1))
                         if numeric_token2 in out_numeric_tokens:
@@ -821,9 +844,13 @@ def discover_range_tokens(value, numeric_tokens):
 
                     if numeric_token not in out_numeric_tokens:
                         continue
+                    if literal_tokens(numeric_token) and not open_phrase_matches(
+                        range_phrase, snipped_value.lower()
+                    ):
+                        continue
                     phrase = range_phrase.replace("REGEX_TKN", numeric_token, 1)
 
-                    m = re.search(phrase, snipped_value.lower())
+                    m = compiled_pattern(phrase).search(snipped_value.lower())
                     if not m:
                         # print('\t'+numeric_token+' didnt work')
                         continue
@@ -835,9 +862,9 @@ def discover_range_tokens(value, numeric_tokens):
                         phrase_found = m.group()
                         out_range_tokens.append((phrase_found, range_phrase))
                         # print('phrase_found='+str(phrase_found))
-                        snipped_value = re.sub(
-                            "(?i)" + phrase_found, " ", snipped_value, flags=re.I
-                        )
+                        snipped_value = compiled_pattern(
+                            "(?i)" + phrase_found, re.I
+                        ).sub(" ", snipped_value)
 
                         # snipped_value = snipped_value.replace(phrase_found, ' ', 1)
                         if numeric_token in out_numeric_tokens:
@@ -6,6 +6,7 @@ import os
 
 # LOG
 import pprint
+import re
 import string
 import sys
 from collections import Counter
@@ -957,6 +958,16 @@ def generate_symbol_summary(attribute_symbols):
     return summary_symbols
 
 
+def merge_symbol_summary(symbols, base_summary, base_has_symbols):
+    # generate_symbol_summary([symbols] + base) given the summary of base
+    if len(symbols) == 0:
+        return base_summary
+    if base_has_symbols == False:
+        return list(symbols)
+    base_symbols = set(base_summary)
+    return [symbol for symbol in list(symbols) if symbol in base_symbols]
+
+
 def symbolset_incremental_pattern(pattern, symbolset):
     if len(symbolset) > 0:
         return list(set(pattern).intersection(symbolset))
@@ -980,6 +991,15 @@ def generate_case_summary(attribute_cases):
     return case_summary
 
 
+def merge_case_summary(case, base_summary, base_has_cases):
+    # generate_case_summary([case] + base) given the summary of base
+    if case == "":
+        return base_summary
+    if base_has_cases == False or base_summary == case:
+        return case
+    return ""
+
+
 def consistent_symbol_sets_increment(consistent_ss, symbol_sig):
 
     consistent_symbol_sets, consistent_symbols = consistent_ss
@@ -992,6 +1012,24 @@ def consistent_symbol_sets_increment(consistent_ss, symbol_sig):
     return consistent_ss
 
 
+_ASCII_ALPHA = re.compile(r"[A-Za-z]").search
+
+
+def has_alpha(token):
+    """True if any character of the token is alphabetic (str.isalpha)."""
+    if token.isascii():
+        return _ASCII_ALPHA(token) is not None
+    return any(c.isalpha() for c in token)
+
+
+def count_token_repeats(candidate_tokens, column_tokens):
+    """Count, for each candidate token, the values of the column containing it."""
+    column_token_counts = Counter()
+    for value_tokens in column_tokens:
+        column_token_counts.update(set(value_tokens))
+    return {part: column_token_counts[part] for part in candidate_tokens}
+
+
 def token_repeats_increment(partof_multiword_value_repeats, candidate_tokens):
     for part in candidate_tokens:
         if part in partof_multiword_value_repeats.keys():
@@ -1037,6 +1075,18 @@ def generate_length_summary(column_lengths):
     return length_summary
 
 
+def merge_length_summary(char_length, base_summary):
+    # generate_length_summary([char_length] + base) given the summary of base
+    if char_length == 0:
+        return dict(base_summary)
+    if base_summary["max"] == 0:
+        return {"min": char_length, "max": char_length}
+    return {
+        "min": min(base_summary["min"], char_length),
+        "max": max(base_summary["max"], char_length),
+    }
+
+
 def charlength_incremental_pattern(length_summary, char_length):
     if char_length > 0:
         length_summary["min"] = min(length_summary["min"], char_length)
@@ -1,15 +1,19 @@
 import argparse
 import codecs
 import csv
+import glob
 import json
+import math
 import os
 import pprint
 import re
+import shutil
 import string
 import subprocess
 import sys
 import traceback
-from multiprocessing import Pool
+from collections import Counter
+from multiprocessing import Pool, get_all_start_methods, get_context
 from os import listdir
 from os.path import isfile, join
 from timeit import default_timer as timer
@@ -33,7 +37,8 @@ from pytheas.header_events import (
 from pytheas.table_classifier_utilities import (
     TableSignatures,
     all_numbers,
-    assess_data_line,
+    DATA_LINE_EVENTS,
+    assess_data_lines,
     assess_non_data_line,
     contains_number,
     discover_aggregation_scope,
@@ -41,7 +46,6 @@ from pytheas.table_classifier_utilities import (
     eval_not_data_cell_rule,
     is_consistent_symbol_sets,
     is_number,
-    line_has_null_equivalent,
     name_table_columns,
     predict_combined_data_confidences,
     predict_fdl,
@@ -51,11 +55,25 @@ from pytheas.table_classifier_utilities import (
 
 
 from .nb_utilities import stop
+
+try:
+    import orjson
+
+    _ORJSON_AVAILABLE = True
+except ImportError:
+    _ORJSON_AVAILABLE = False
+
 pp = pprint.PrettyPrinter(indent=4)
 
 
 DEFAULT_WEIGHTS = object()
 
+# an arithmetic sequence event without a weight counts as the next longer one
+ADJACENT_ARITHMETIC_SEQUENCE_REWRITE = {
+    f"ADJACENT_ARITHMETIC_SEQUENCE_{steps}": f"ADJACENT_ARITHMETIC_SEQUENCE_{steps + 1}"
+    for steps in range(2, 6)
+}
+
 
 def generate_processing_tasks(
     pytheas_model, db_cred, files, max_lines, top_level_dir, opendata_engine
@@ -197,8 +215,12 @@ def available_cpu_count():
 
 
 class API(object):
-    def __init__(self, weights=DEFAULT_WEIGHTS, db_params=None):
+    def __init__(
+        self, weights=DEFAULT_WEIGHTS, db_params=None, workers=None, exact=True
+    ):
         self.real_pytheas = PYTHEAS()
+        self.real_pytheas.exact = exact
+        self.workers = workers
         self.load_weights(weights)
 
     def load_weights(self, filepath):
@@ -215,6 +237,11 @@ class API(object):
     def infer_annotations_from_df(self, df):
         return self.real_pytheas.infer_annotations_from_df(df)
 
+    def infer_annotations_files(self, filepaths, max_lines=None):
+        return infer_annotations_files(
+            self.real_pytheas, filepaths, max_lines, self.workers
+        )
+
     def learn_and_save_weights(
         self,
         files_path,
@@ -290,8 +317,8 @@ class API(object):
             pat_not_data_line_rules_DATA.append(res[4])
             pat_data_cell_rules_DATA.append(res[5])
             pat_not_data_cell_rules_DATA.append(res[6])
-            data_rules_fired = Json(res[7])
-            not_data_rules_fired = Json(res[8])
+            data_rules_fired = res[7]
+            not_data_rules_fired = res[8]
             pat_line_and_cell_rules_DATA.append(
                 (datafile_key, data_rules_fired, not_data_rules_fired)
             )
@@ -348,6 +375,11 @@ class PYTHEAS:
             "cell": {"not_data": [], "data": []},
             "line": {"not_data": [], "data": []},
         }
+        # when False, inference stops evaluating the not data rules of a cell at
+        # the strongest rule fired, which is all its confidence depends on
+        self.exact = True
+        self._cell_rule_evaluators = None
+        self._active_cell_rules = None
         self.fuzzy_rules = dict()
         self.fuzzy_rules["cell"] = {
             "not_data": {
@@ -641,6 +673,62 @@ class PYTHEAS:
     def leave_rules_out(self, ignore_rules):
         self.ignore_rules = ignore_rules
 
+    def cell_rule_evaluators(self, exact=True):
+        """Straight-line evaluators for the cell rules that are not ignored,
+        regenerated whenever the rules or the ignored rules are replaced, or
+        the not data rule weights change when not exact."""
+        key = (self.fuzzy_rules["cell"], self.ignore_rules["cell"])
+        not_data_weights = None
+        if not exact:
+            not_data_weights = tuple(
+                rule_weight_array(
+                    self.fuzzy_rules["cell"]["not_data"],
+                    self.parameters.not_data_weight_lower_bound,
+                )
+            )
+        if (
+            self._cell_rule_evaluators is None
+            or any(
+                cached is not current
+                for cached, current in zip(self._cell_rule_evaluators[0], key)
+            )
+            or self._cell_rule_evaluators[1] != not_data_weights
+        ):
+            evaluators = {
+                "data": compile_rule_evaluator(
+                    eval_data_cell_rule,
+                    self.fuzzy_rules["cell"]["data"],
+                    self.ignore_rules["cell"]["data"],
+                ),
+                "not_data": compile_rule_evaluator(
+                    eval_not_data_cell_rule,
+                    self.fuzzy_rules["cell"]["not_data"],
+                    self.ignore_rules["cell"]["not_data"],
+                    not_data_weights,
+                ),
+            }
+            self._cell_rule_evaluators = (key, not_data_weights, evaluators)
+        return self._cell_rule_evaluators[2]
+
+    def active_cell_rules(self):
+        """(rule position, rule) of the cell rules that are not ignored, by
+        class, rebuilt whenever the rules or the ignored rules are replaced."""
+        key = (self.fuzzy_rules["cell"], self.ignore_rules["cell"])
+        if self._active_cell_rules is None or any(
+            cached is not current
+            for cached, current in zip(self._active_cell_rules[0], key)
+        ):
+            active_rules = {
+                unit_class: tuple(
+                    (rule_index, rule)
+                    for rule_index, rule in enumerate(unit_class_rules)
+                    if rule not in self.ignore_rules["cell"][unit_class]
+                )
+                for unit_class, unit_class_rules in self.fuzzy_rules["cell"].items()
+            }
+            self._active_cell_rules = (key, active_rules)
+        return self._active_cell_rules[1]
+
     def save_weights(self, filepath="trained_rules.json"):
         with open(filepath, "w") as outfile:
             json.dump(self.fuzzy_rules, outfile)
@@ -1377,7 +1465,7 @@ class PYTHEAS:
 
         if rules_fired is None:
             data_rules_fired, not_data_rules_fired = collect_dataframe_rules(
-                file_dataframe_trimmed, self, signatures
+                file_dataframe_trimmed, self, signatures, self.exact
             )
         else:
             data_rules_fired, not_data_rules_fired = rules_fired
@@ -1544,22 +1632,21 @@ class PYTHEAS:
             num_lines_processed = 0
             all_csv_tuples = []
             if failure == None:
-                with codecs.open(filepath, "rU", encoding=discovered_encoding) as f:
-                    chunk = f.read()
-                    if chunk:
-                        for line in csv.reader(
-                            chunk.split("\n"),
-                            quotechar='"',
-                            delimiter=discovered_delimiter,
-                            skipinitialspace=True,
-                        ):
-                            num_lines_processed += 1
-                            if len(line) == 0 or sum(len(s.strip()) for s in line) == 0:
-                                blanklines.append(num_lines_processed - 1)
-                            all_csv_tuples.append(line)
-                            # STOP RETRIEVING LINES FROM THE FILE AT MAX LINES
-                            if max_lines != None and num_lines_processed == max_lines:
-                                break
+                with open(filepath, "r", encoding=discovered_encoding, newline="") as f:
+                    # stream the lines, the file is never held in memory whole
+                    for line in csv.reader(
+                        f,
+                        quotechar='"',
+                        delimiter=discovered_delimiter,
+                        skipinitialspace=True,
+                    ):
+                        num_lines_processed += 1
+                        if not any(s.strip() for s in line):
+                            blanklines.append(num_lines_processed - 1)
+                        all_csv_tuples.append(line)
+                        # STOP RETRIEVING LINES FROM THE FILE AT MAX LINES
+                        if max_lines != None and num_lines_processed == max_lines:
+                            break
 
                     file_dataframe = file_utilities.merged_df(failure, all_csv_tuples)
 
@@ -1706,6 +1793,11 @@ class PYTHEAS:
                 self,
             )
 
+            # the rules fired go back to the parent process in sparse form
+            rules_fired = sparse_rules_fired(
+                data_rules_fired, not_data_rules_fired, self.fuzzy_rules
+            )
+
             end = timer()
             processing_time = end - start
             return (
@@ -1716,8 +1808,8 @@ class PYTHEAS:
                 pat_not_data_line_rules,
                 pat_data_cell_rules,
                 pat_not_data_cell_rules,
-                data_rules_fired,
-                not_data_rules_fired,
+                rules_fired["data"],
+                rules_fired["not_data"],
                 lines_in_file,
                 lines_in_sample,
                 processing_time,
@@ -1742,7 +1834,14 @@ def convert_predictions(
     annotations["columns_in_file"] = file_num_columns
     annotations["columns_in_file_considered"] = file_max_columns_processed
     annotations["tables"] = []
-    for key in predictions.keys():
+    body_confidences = combined_table_confidence_vec(
+        [
+            prediction["fdl_confidence"]["avg_majority_confidence"]
+            for prediction in predictions.values()
+        ],
+        [prediction["data_end_confidence"] for prediction in predictions.values()],
+    )
+    for key, body_confidence in zip(predictions.keys(), body_confidences):
         table = dict()
 
         table["table_counter"] = int(key)
@@ -1760,12 +1859,7 @@ def convert_predictions(
                 predictions[key]["fdl_confidence"]["avg_majority_confidence"]
             ),
             "body_end": float(predictions[key]["data_end_confidence"]),
-            "body": float(
-                combined_table_confidence(
-                    predictions[key]["fdl_confidence"]["avg_majority_confidence"],
-                    predictions[key]["data_end_confidence"],
-                )
-            ),
+            "body": float(body_confidence),
         }
         table["columns"] = predictions[key]["columns"]
         annotations["tables"].append(table)
@@ -1937,25 +2031,20 @@ def save_training_data(
                                     cell_class,
                                 )
                             )
-                            for rule in pat_model.fuzzy_rules["cell"]["data"].keys():
-                                rule_fired = False
-                                if (
-                                    rule
-                                    in data_rules_fired[line_index][column_label][
-                                        "agreements"
-                                    ]
-                                ):
-                                    rule_fired = True
-                                pat_data_cell_rules_fired.append(rule_fired)
-                            is_aggregate = data_rules_fired[line_index][column_label][
-                                "aggregate"
-                            ]
+                            agreements = set(
+                                data_rules_fired[line_index][column_label].agreements
+                            )
+                            for rule in pat_model.fuzzy_rules["cell"]["data"]:
+                                pat_data_cell_rules_fired.append(rule in agreements)
+                            is_aggregate = data_rules_fired[line_index][
+                                column_label
+                            ].aggregate
                             summary_strength = data_rules_fired[line_index][
                                 column_label
-                            ]["summary_strength"]
+                            ].summary_strength
                             is_null_equivalent = data_rules_fired[line_index][
                                 column_label
-                            ]["null_equivalent"]
+                            ].null_equivalent
                             pat_data_cell_rules_attribute_values.append(
                                 (
                                     crawl_datafile_key,
@@ -1969,21 +2058,18 @@ def save_training_data(
                                 )
                                 + tuple(pat_data_cell_rules_fired)
                             )
-                            for rule in pat_model.fuzzy_rules["cell"][
-                                "not_data"
-                            ].keys():
-                                rule_fired = False
-                                if (
-                                    rule
-                                    in not_data_rules_fired[line_index][column_label][
-                                        "disagreements"
-                                    ]
-                                ):
-                                    rule_fired = True
-                                pat_not_data_cell_rules_fired.append(rule_fired)
+                            disagreements = set(
+                                not_data_rules_fired[line_index][
+                                    column_label
+                                ].disagreements
+                            )
+                            for rule in pat_model.fuzzy_rules["cell"]["not_data"]:
+                                pat_not_data_cell_rules_fired.append(
+                                    rule in disagreements
+                                )
                             disagreement_summary_strength = not_data_rules_fired[
                                 line_index
-                            ][column_label]["disagreement_summary_strength"]
+                            ][column_label].disagreement_summary_strength
                             pat_not_data_cell_rules_attribute_values.append(
                                 (
                                     crawl_datafile_key,
@@ -2016,11 +2102,9 @@ def save_training_data(
                         else:  ################ ADDED
                             break  ################
                         # flag which DATA line rules fired
-                        for rule in pat_model.fuzzy_rules["line"]["data"].keys():
-                            rule_fired = False
-                            if rule in data_rules_fired[line_index]["line"]:
-                                rule_fired = True
-                            pat_data_line_rules_fired.append(rule_fired)
+                        line_agreements = set(data_rules_fired[line_index]["line"])
+                        for rule in pat_model.fuzzy_rules["line"]["data"]:
+                            pat_data_line_rules_fired.append(rule in line_agreements)
 
                         pat_data_line_rules_attribute_values.append(
                             (crawl_datafile_key, line_index, row_class, undersample)
@@ -2029,11 +2113,13 @@ def save_training_data(
                         # print(f'pat_data_line_rules_attribute_values={pat_data_line_rules_attribute_values}')
                         # input()
                         # flag which NOT DATA line rules fired
-                        for rule in pat_model.fuzzy_rules["line"]["not_data"].keys():
-                            rule_fired = False
-                            if rule in not_data_rules_fired[line_index]["line"]:
-                                rule_fired = True
-                            pat_not_data_line_rules_fired.append(rule_fired)
+                        line_disagreements = set(
+                            not_data_rules_fired[line_index]["line"]
+                        )
+                        for rule in pat_model.fuzzy_rules["line"]["not_data"]:
+                            pat_not_data_line_rules_fired.append(
+                                rule in line_disagreements
+                            )
 
                         pat_not_data_line_rules_attribute_values.append(
                             (crawl_datafile_key, line_index, row_class, undersample)
@@ -2490,8 +2576,11 @@ def discover_next_table(
 def predict_subheaders(
     csv_file, cand_data, predicted_pat_sub_headers, pat_blank_lines, pat_headers, model
 ):
-    ignore_rules = model.ignore_rules
     fuzzy_rules = model.fuzzy_rules
+    cell_data_rules = tuple(fuzzy_rules["cell"]["data"])
+    active_cell_rules = model.active_cell_rules()
+    active_data_rules = active_cell_rules["data"]
+    active_not_data_rules = active_cell_rules["not_data"]
     args = model.parameters
 
     cand_subhead_indexes = predicted_pat_sub_headers
@@ -2503,48 +2592,56 @@ def predict_subheaders(
     aggregation_rows = dict()
     first_column_data_values = []
 
-    for row in cand_data.loc[certain_data_indexes].itertuples():
-        first_value = str(row[1]).strip()
+    # positional access to the first column, avoids .loc/.itertuples per row
+    first_column = csv_file.iloc[:, 0].to_numpy()
+    line_position = {
+        line_label: position for position, line_label in enumerate(csv_file.index)
+    }
+
+    for line_label, first_cell in zip(
+        cand_data.index, cand_data.iloc[:, 0].to_numpy()
+    ):
+        first_value = str(first_cell).strip()
         first_value_tokens = first_value.lower().split()
         for aggregation_phrase in pat_util.aggregation_functions:
             agg_index = first_value.lower().find(aggregation_phrase[0])
             if agg_index > -1:
-                aggregation_rows[row.Index] = {}
-                aggregation_rows[row.Index]["value"] = first_value
-                aggregation_rows[row.Index][
+                aggregation_rows[line_label] = {}
+                aggregation_rows[line_label]["value"] = first_value
+                aggregation_rows[line_label][
                     "aggregation_function"
                 ] = aggregation_phrase[1]
-                aggregation_rows[row.Index]["aggregation_phrase"] = aggregation_phrase[
+                aggregation_rows[line_label]["aggregation_phrase"] = aggregation_phrase[
                     0
                 ]
-                aggregation_rows[row.Index]["aggregation_label"] = (
+                aggregation_rows[line_label]["aggregation_label"] = (
                     first_value[:agg_index]
                     + first_value[agg_index + len(aggregation_phrase[0]) :]
                 )
                 break
 
         if (
-            row.Index not in aggregation_rows.keys()
+            line_label not in aggregation_rows
             and first_value.lower() not in pat_util.null_equivalent_values
-            and row.Index not in cand_subhead_indexes
+            and line_label not in cand_subhead_indexes
         ):
             first_column_data_values.append(first_value)
 
     certain_data_indexes = list(
         set(certain_data_indexes)
-        - set(aggregation_rows.keys())
+        - set(aggregation_rows)
         - set(cand_subhead_indexes)
     )
 
-    for row in csv_file.loc[cand_subhead_indexes].itertuples():
-        first_value = str(row[1]).strip()
+    for line_label in cand_subhead_indexes:
+        first_value = str(first_column[line_position[line_label]]).strip()
         if (
             first_value.lower() not in ["nan", "none", ""]
-            and row.Index not in aggregation_rows.keys()
+            and line_label not in aggregation_rows
         ):
-            candidate_subheaders[row.Index] = first_value
+            candidate_subheaders[line_label] = first_value
 
-    cand_subhead_indexes = list(candidate_subheaders.keys())
+    cand_subhead_indexes = list(candidate_subheaders)
     (
         aggregation_rows,
         certain_data_indexes,
@@ -2559,6 +2656,8 @@ def predict_subheaders(
         certain_data_indexes,
         pat_headers,
     )
+    # kept in step with predicted_pat_sub_headers for O(1) membership checks
+    predicted_pat_sub_header_set = set(predicted_pat_sub_headers)
 
     if cand_subhead_indexes != None and len(cand_subhead_indexes) > 0:
         first_column_value_patterns = []
@@ -2628,42 +2727,51 @@ def predict_subheaders(
             [len(t) for t in first_column_value_patterns],
         )
 
+        # summaries of the first column without the candidate, merged with
+        # each candidate value below instead of being recomputed
+        base_symbol_summary = value_symbol_summary
+        base_has_symbols = any(len(s) > 0 for s in first_column_value_symbols)
+        base_case_summary = case_summary
+        base_has_cases = any(c != "" for c in first_column_value_cases)
+        base_length_summary = length_summary
+        data_cell_weights = rule_weight_array(
+            fuzzy_rules["cell"]["data"], args.weight_lower_bound
+        )
+        not_data_cell_weights = rule_weight_array(
+            fuzzy_rules["cell"]["not_data"], args.not_data_weight_lower_bound
+        )
+        max_not_data_weight = not_data_cell_weights.max(initial=0)
+
         candidate_tokens = set()
         if len(first_column_value_tokens) > 0:
-            candidate_tokens = set(
-                [t for t in first_column_value_tokens[0] if any(c.isalpha() for c in t)]
-            )
+            candidate_tokens = {
+                t for t in first_column_value_tokens[0] if pat_util.has_alpha(t)
+            }
+        # object array so that == below compares element-wise
+        first_column_data_array = np.asarray(first_column_data_values, dtype=object)
         candidate_count_for_value = 0
         if len(first_column_data_values) > 2:
             candidate_count_for_value = np.count_nonzero(
-                first_column_data_values[
+                first_column_data_array[
                     2 : min(args.max_summary_strength, len(first_column_data_values))
                 ]
-                == str(value).strip()
+                == first_column_data_values[0]
             )
 
-        partof_multiword_value_repeats = dict()
-        for part in candidate_tokens:
-            partof_multiword_value_repeats[part] = 0
-            for value_tokens in first_column_value_tokens:
-                if part in value_tokens:
-                    partof_multiword_value_repeats[part] += 1
+        partof_multiword_value_repeats = pat_util.count_token_repeats(
+            candidate_tokens, first_column_value_tokens
+        )
         consistent_symbol_sets, _ = is_consistent_symbol_sets(
             first_column_value_symbols
         )
         data_rules_fired = {}
         data_rules_fired[1] = {}
-        data_rules_fired[1][0] = {}
-        data_rules_fired[1][0]["agreements"] = []
-        data_rules_fired[1][0]["null_equivalent"] = False
-        for rule in fuzzy_rules["cell"]["data"].keys():
+        data_rules_fired[1][0] = CellEvidence()
+        for rule_index, rule in active_data_rules:
             rule_fired = False
             # Don't bother looking for agreements if there are no patterns
             non_empty_patterns = 0
-            if (
-                rule not in ignore_rules["cell"]["data"]
-                and len(first_column_value_patterns) > 0
-            ):
+            if len(first_column_value_patterns) > 0:
                 for pattern in first_column_value_patterns:
                     if pattern != []:
                         non_empty_patterns += 1
@@ -2691,18 +2799,19 @@ def predict_subheaders(
                     )
                     # if rule_fired and "_REPEATS_" not in rule and rule not in ['FW_SUMMARY_D', 'FW_TWO_OR_MORE_OR_MORE_NO_SPACE', 'FW_TWO_OR_MORE_OR_MORE_NO_SPACE_FIRST_TWO','BW_TWO_OR_MORE_OR_MORE_NO_SPACE', 'BW_TWO_OR_MORE_OR_MORE_NO_SPACE_FIRST_TWO', 'BW_LENGTH_4PLUS', 'FW_LENGTH_4PLUS']:
                     if rule_fired and "_REPEATS_" not in rule:
-                        data_rules_fired[1][0]["agreements"].append(rule)
+                        data_rules_fired[1][0].agreements.append(rule)
 
         # input(f"\nfirst_column_data_cell_rules_fired={data_rules_fired[1][0]['agreements']}")
 
-        for row in csv_file.loc[cand_subhead_indexes].itertuples():
-            first_value = str(row[1]).strip()
+        for line_label in cand_subhead_indexes:
+            first_value = str(first_column[line_position[line_label]]).strip()
             if first_value.lower() in ["", "nan", "none", "null"]:
                 continue
             if first_value in first_column_data_values:
                 continue
-            if row.Index - 1 in pat_blank_lines or row.Index - 1 in pat_headers:
-                predicted_pat_sub_headers.append(row.Index)
+            if line_label - 1 in pat_blank_lines or line_label - 1 in pat_headers:
+                predicted_pat_sub_headers.append(line_label)
+                predicted_pat_sub_header_set.add(line_label)
             else:
 
                 value_tokens = first_value.lower().split()
@@ -2733,12 +2842,14 @@ def predict_subheaders(
                 value_pattern_BW_summary, _ = pat_util.generate_pattern_summary(
                     bw_patterns
                 )
-                value_symbol_summary = pat_util.generate_symbol_summary(column_symbols)
-                case_summary = pat_util.generate_case_summary(
-                    [case] + first_column_value_cases
+                value_symbol_summary = pat_util.merge_symbol_summary(
+                    column_symbols[0], base_symbol_summary, base_has_symbols
+                )
+                case_summary = pat_util.merge_case_summary(
+                    case, base_case_summary, base_has_cases
                 )
-                length_summary = pat_util.generate_length_summary(
-                    [value_num_chars] + first_column_value_char_lengths
+                length_summary = pat_util.merge_length_summary(
+                    value_num_chars, base_length_summary
                 )
                 all_patterns_numeric, _ = pat_util.generate_all_numeric_sig_pattern(
                     [table_classifier_utilities.eval_numeric_pattern(pattern)]
@@ -2748,32 +2859,27 @@ def predict_subheaders(
                 column_values = [first_value] + first_column_data_values
                 column_tokens = [value_tokens] + first_column_value_tokens
 
-                candidate_tokens = set(
-                    [t for t in value_tokens if any(c.isalpha() for c in t)]
-                )
+                candidate_tokens = {t for t in value_tokens if pat_util.has_alpha(t)}
                 candidate_count_for_value = 0
                 if len(column_values) > 2:
+                    # column_values[2:] is first_column_data_array[1:]
                     candidate_count_for_value = np.count_nonzero(
-                        column_values[
-                            2 : min(args.max_summary_strength, len(column_values))
+                        first_column_data_array[
+                            1 : min(args.max_summary_strength, len(column_values)) - 1
                         ]
-                        == str(value).strip()
+                        == first_value
                     )
 
-                partof_multiword_value_repeats = dict()
-                for part in candidate_tokens:
-                    partof_multiword_value_repeats[part] = 0
-                    for value_tokens in column_tokens:
-                        if part in value_tokens:
-                            partof_multiword_value_repeats[part] += 1
+                partof_multiword_value_repeats = pat_util.count_token_repeats(
+                    candidate_tokens, column_tokens
+                )
 
                 consistent_symbol_sets, _ = is_consistent_symbol_sets(column_symbols)
                 cand_subhead_data_cell_rules_fired = []
                 data_rules_fired[0] = {}
-                data_rules_fired[0][0] = {}
-                data_rules_fired[0][0]["agreements"] = []
-                data_rules_fired[0][0]["null_equivalent"] = False
-                for rule in fuzzy_rules["cell"]["data"].keys():
+                data_rules_fired[0][0] = CellEvidence()
+                agreement_ids = []
+                for rule_index, rule in enumerate(cell_data_rules):
                     rule_fired = False
                     non_empty_patterns = 0
                     if (
@@ -2803,10 +2909,33 @@ def predict_subheaders(
                                 len(column_values),
                             )
                             if rule_fired == True and "_REPEATS_" not in rule:
-                                data_rules_fired[0][0]["agreements"].append(rule)
+                                data_rules_fired[0][0].agreements.append(rule)
+                                agreement_ids.append(rule_index)
+
+                #######################################################################v######
+                #  DATA value classification
+                data_score = max_rule_weight(data_cell_weights, agreement_ids)
+                POPULATION_WEIGHT = 1 - (1 - args.p) ** (2 * summary_strength)
+                if data_score != None:
+                    if args.summary_population_factor:
+                        cell_data_score = data_score * POPULATION_WEIGHT
+                    else:
+                        cell_data_score = data_score
 
                 value_disagreements = []
+                disagreement_ids = []
                 disagreement_summary_strength = summary_strength - 1
+
+                # the not data score cannot exceed the strongest not data rule,
+                # skip the not data rules when the data score already wins
+                not_data_score_bound = not_data_cell_score_bound(
+                    max_not_data_weight, disagreement_summary_strength, args
+                )
+                if (
+                    cell_data_score > not_data_score_bound
+                ):  # candidate subheader is definitely data, move along
+                    continue
+
                 if len(pattern) > 0:
                     repetitions_of_candidate = column_values[1:].count(first_value)
                     neighbor = ""
@@ -2816,11 +2945,10 @@ def predict_subheaders(
                     except:
                         repetitions_of_neighbor = 0
 
-                    for rule in fuzzy_rules["cell"]["not_data"].keys():
+                    for rule_index, rule in active_not_data_rules:
                         rule_fired = False
                         if (
-                            rule not in ignore_rules["cell"]["not_data"]
-                            and disagreement_summary_strength > 0
+                            disagreement_summary_strength > 0
                             and (
                                 all_numbers(column_symbols) == False
                                 or is_number(symbols) == False
@@ -2848,27 +2976,12 @@ def predict_subheaders(
                             )
                             if rule_fired == True and "_REPEATS_" not in rule:
                                 value_disagreements.append(rule)
-
-                #######################################################################v######
-                #  DATA value classification
-                data_score = max_score(
-                    data_rules_fired[0][0]["agreements"],
-                    fuzzy_rules["cell"]["data"],
-                    args.weight_lower_bound,
-                )
-                POPULATION_WEIGHT = 1 - (1 - args.p) ** (2 * summary_strength)
-                if data_score != None:
-                    if args.summary_population_factor:
-                        cell_data_score = data_score * POPULATION_WEIGHT
-                    else:
-                        cell_data_score = data_score
+                                disagreement_ids.append(rule_index)
 
                 #######################################################################v######
                 #  NOT DATA value classification
-                not_data_score = max_score(
-                    value_disagreements,
-                    fuzzy_rules["cell"]["not_data"],
-                    args.not_data_weight_lower_bound,
+                not_data_score = max_rule_weight(
+                    not_data_cell_weights, disagreement_ids
                 )
                 POPULATION_WEIGHT = 1 - (1 - args.p) ** (
                     2 * disagreement_summary_strength
@@ -2885,17 +2998,18 @@ def predict_subheaders(
                     continue
 
                 if (
-                    row.Index - 1 in predicted_pat_sub_headers
-                    and row.Index - 2 in predicted_pat_sub_headers
+                    line_label - 1 in predicted_pat_sub_header_set
+                    and line_label - 2 in predicted_pat_sub_header_set
                 ):
                     continue
 
-                if row.Index != cand_data.index[-1]:
-                    predicted_pat_sub_headers.append(row.Index)
+                if line_label != cand_data.index[-1]:
+                    predicted_pat_sub_headers.append(line_label)
+                    predicted_pat_sub_header_set.add(line_label)
 
     # print(f'predicted_pat_sub_headers={predicted_pat_sub_headers}')
     for s_i, subheader in enumerate(predicted_pat_sub_headers):
-        if subheader not in subheader_scope.keys():
+        if subheader not in subheader_scope:
             if s_i + 1 == len(predicted_pat_sub_headers):
                 subheader_scope[subheader] = list(
                     range(subheader + 1, cand_data.index[-1] + 1)
@@ -2919,7 +3033,9 @@ def predict_subheaders_new(
 ):
     args = model.parameters
     fuzzy_rules = model.fuzzy_rules
-    ignore_rules = model.ignore_rules
+    active_cell_rules = model.active_cell_rules()
+    active_data_rules = active_cell_rules["data"]
+    active_not_data_rules = active_cell_rules["not_data"]
 
     cand_subhead_indexes = list(
         set(
@@ -2933,54 +3049,61 @@ def predict_subheaders_new(
     aggregation_rows = {}
     first_column_data_values = []
 
+    # positional access to the rows, avoids .loc/.itertuples per row
+    csv_rows = csv_file.to_numpy()
+    line_position = {
+        line_label: position for position, line_label in enumerate(csv_file.index)
+    }
+
     # print(f'csv_file=\n{csv_file}\n')
     # print(f'cand_data=\n{cand_data}\n')
 
-    for row in csv_file.loc[certain_data_indexes].itertuples():
-        first_value = str(row[1]).strip()
-        # input(f'row_{row.Index}: first_value={first_value}')
+    for line_label in certain_data_indexes:
+        row_values = csv_rows[line_position[line_label]]
+        first_value = str(row_values[0]).strip()
+        # input(f'row_{line_label}: first_value={first_value}')
         first_value_tokens = first_value.lower().split()
         for aggregation_phrase in pat_util.aggregation_functions:
             agg_index = first_value.lower().find(aggregation_phrase[0])
             # print(f'{aggregation_phrase[0]} in {first_value.lower()}={aggregation_phrase[0] in first_value.lower()}')
 
-            if agg_index > -1 and contains_number(row[1:]):
-                aggregation_rows[row.Index] = {}
-                aggregation_rows[row.Index]["value"] = first_value
-                aggregation_rows[row.Index][
+            if agg_index > -1 and contains_number(row_values):
+                aggregation_rows[line_label] = {}
+                aggregation_rows[line_label]["value"] = first_value
+                aggregation_rows[line_label][
                     "aggregation_function"
                 ] = aggregation_phrase[1]
-                aggregation_rows[row.Index]["aggregation_phrase"] = aggregation_phrase[
+                aggregation_rows[line_label]["aggregation_phrase"] = aggregation_phrase[
                     0
                 ]
-                aggregation_rows[row.Index]["aggregation_label"] = (
+                aggregation_rows[line_label]["aggregation_label"] = (
                     first_value[:agg_index]
                     + first_value[agg_index + len(aggregation_phrase[0]) :]
                 )
                 break
 
         if (
-            row.Index not in aggregation_rows.keys()
+            line_label not in aggregation_rows
             and first_value.lower() not in pat_util.null_equivalent_values
-            and row.Index not in cand_subhead_indexes
+            and line_label not in cand_subhead_indexes
         ):
             first_column_data_values.append(first_value)
 
     certain_data_indexes = list(
         set(certain_data_indexes)
-        - set(aggregation_rows.keys())
+        - set(aggregation_rows)
         - set(cand_subhead_indexes)
     )
 
-    for row in csv_file.loc[cand_subhead_indexes].itertuples():
-        first_value = str(row[1]).strip()
+    for line_label in cand_subhead_indexes:
+        first_value = str(csv_rows[line_position[line_label], 0]).strip()
         if (
             first_value.lower() not in ["nan", "none", ""]
-            and row.Index not in aggregation_rows.keys()
+            and line_label not in aggregation_rows
         ):
-            candidate_subheaders[row.Index] = first_value
+            candidate_subheaders[line_label] = first_value
 
-    cand_subhead_indexes = list(candidate_subheaders.keys())
+    cand_subhead_indexes = list(candidate_subheaders)
 
     (
         aggregation_rows,
@@ -2996,6 +3119,8 @@ def predict_subheaders_new(
         certain_data_indexes,
         pat_headers,
     )
+    # kept in step with predicted_pat_sub_headers for O(1) membership checks
+    predicted_pat_sub_header_set = set(predicted_pat_sub_headers)
 
     if cand_subhead_indexes != None and len(cand_subhead_indexes) > 0:
         first_column_value_patterns = []
@@ -3066,45 +3191,54 @@ def predict_subheaders_new(
             first_column_value_char_lengths
         )
 
+        # summaries of the first column without the candidate, merged with
+        # each candidate value below instead of being recomputed
+        base_symbol_summary = value_symbol_summary
+        base_has_symbols = any(len(s) > 0 for s in first_column_value_symbols)
+        base_case_summary = case_summary
+        base_has_cases = any(c != "" for c in first_column_value_cases)
+        base_length_summary = length_summary
+        data_cell_weights = rule_weight_array(
+            fuzzy_rules["cell"]["data"], args.weight_lower_bound
+        )
+        not_data_cell_weights = rule_weight_array(
+            fuzzy_rules["cell"]["not_data"], args.not_data_weight_lower_bound
+        )
+        max_not_data_weight = not_data_cell_weights.max(initial=0)
+
         if len(first_column_value_tokens) > 0:
-            candidate_tokens = set(
-                [t for t in first_column_value_tokens[0] if any(c.isalpha() for c in t)]
-            )
+            candidate_tokens = {
+                t for t in first_column_value_tokens[0] if pat_util.has_alpha(t)
+            }
         else:
             candidate_tokens = set()
+        # object array so that == below compares element-wise
+        first_column_data_array = np.asarray(first_column_data_values, dtype=object)
         if len(first_column_data_values) > 2:
             candidate_count_of_value = np.count_nonzero(
-                first_column_data_values[
+                first_column_data_array[
                     2 : min(args.max_summary_strength, len(first_column_data_values))
                 ]
-                == str(value).strip()
+                == first_column_data_values[0]
             )
         else:
             candidate_count_of_value = 0
 
-        partof_multiword_value_repeats = dict()
-        for part in candidate_tokens:
-            partof_multiword_value_repeats[part] = 0
-            for value_tokens in first_column_value_tokens:
-                if part in value_tokens:
-                    partof_multiword_value_repeats[part] += 1
+        partof_multiword_value_repeats = pat_util.count_token_repeats(
+            candidate_tokens, first_column_value_tokens
+        )
         consistent_symbol_sets, _ = is_consistent_symbol_sets(
             first_column_value_symbols
         )
         data_rules_fired = {}
         data_rules_fired[1] = {}
-        data_rules_fired[1][0] = {}
-        data_rules_fired[1][0]["agreements"] = []
-        data_rules_fired[1][0]["null_equivalent"] = False
-        for rule in fuzzy_rules["cell"]["data"].keys():
+        data_rules_fired[1][0] = CellEvidence()
+        for rule_index, rule in active_data_rules:
             rule_fired = False
 
             # Don't bother looking for agreements if there are no patterns
             non_empty_patterns = 0
-            if (
-                rule not in ignore_rules["cell"]["data"]
-                and len(first_column_value_patterns) > 0
-            ):
+            if len(first_column_value_patterns) > 0:
                 for pattern in first_column_value_patterns:
                     if pattern != []:
                         non_empty_patterns += 1
@@ -3131,18 +3265,19 @@ def predict_subheaders_new(
                         len(first_column_data_values),
                     )
                     if rule_fired and "_REPEATS_" not in rule:
-                        data_rules_fired[1][0]["agreements"].append(rule)
+                        data_rules_fired[1][0].agreements.append(rule)
 
         # input(f"\nfirst_column_data_cell_rules_fired={data_rules_fired[1][0]['agreements']}")
 
-        for row in csv_file.loc[cand_subhead_indexes].itertuples():
-            first_value = str(row[1]).strip()
+        for line_label in cand_subhead_indexes:
+            first_value = str(csv_rows[line_position[line_label], 0]).strip()
             if first_value.lower() in ["", "nan", "none", "null"]:
                 continue
             if first_value in first_column_data_values:
                 continue
-            if row.Index - 1 in pat_blank_lines or row.Index - 1 in pat_headers:
-                predicted_pat_sub_headers.append(row.Index)
+            if line_label - 1 in pat_blank_lines or line_label - 1 in pat_headers:
+                predicted_pat_sub_headers.append(line_label)
+                predicted_pat_sub_header_set.add(line_label)
             else:
 
                 value_tokens = first_value.lower().split()
@@ -3163,7 +3298,7 @@ def predict_subheaders_new(
                         [pattern] + first_column_value_patterns,
                         [symbols] + first_column_value_symbols,
                     )
-                    # input(f'\nrow_{row.Index} {[pattern]+first_column_value_patterns}')
+                    # input(f'\nrow_{line_label} {[pattern]+first_column_value_patterns}')
                     # print(f'column_patterns={column_patterns}')
                 (
                     value_pattern_summary,
@@ -3176,12 +3311,14 @@ def predict_subheaders_new(
                 value_pattern_BW_summary, _ = pat_util.generate_pattern_summary(
                     bw_patterns
                 )
-                value_symbol_summary = pat_util.generate_symbol_summary(column_symbols)
-                case_summary = pat_util.generate_case_summary(
-                    [case] + first_column_value_cases
+                value_symbol_summary = pat_util.merge_symbol_summary(
+                    column_symbols[0], base_symbol_summary, base_has_symbols
                 )
-                length_summary = pat_util.generate_length_summary(
-                    [value_num_chars] + first_column_value_char_lengths
+                case_summary = pat_util.merge_case_summary(
+                    case, base_case_summary, base_has_cases
+                )
+                length_summary = pat_util.merge_length_summary(
+                    value_num_chars, base_length_summary
                 )
                 all_patterns_numeric, _ = pat_util.generate_all_numeric_sig_pattern(
                     [table_classifier_utilities.eval_numeric_pattern(pattern)]
@@ -3191,37 +3328,31 @@ def predict_subheaders_new(
                 column_values = [first_value] + first_column_data_values
                 column_tokens = [value_tokens] + first_column_value_tokens
 
-                candidate_tokens = set(
-                    [t for t in value_tokens if any(c.isalpha() for c in t)]
-                )
+                candidate_tokens = {t for t in value_tokens if pat_util.has_alpha(t)}
                 if len(column_values) > 2:
+                    # column_values[2:] is first_column_data_array[1:]
                     candidate_count_of_value = np.count_nonzero(
-                        column_values[
-                            2 : min(args.max_summary_strength, len(column_values))
+                        first_column_data_array[
+                            1 : min(args.max_summary_strength, len(column_values)) - 1
                         ]
-                        == str(value).strip()
+                        == first_value
                     )
                 else:
                     candidate_count_of_value = 0
-                partof_multiword_value_repeats = dict()
-                for part in candidate_tokens:
-                    partof_multiword_value_repeats[part] = 0
-                    for value_tokens in column_tokens:
-                        if part in value_tokens:
-                            partof_multiword_value_repeats[part] += 1
+                partof_multiword_value_repeats = pat_util.count_token_repeats(
+                    candidate_tokens, column_tokens
+                )
 
                 consistent_symbol_sets, _ = is_consistent_symbol_sets(column_symbols)
                 cand_subhead_data_cell_rules_fired = []
                 data_rules_fired[0] = {}
-                data_rules_fired[0][0] = {}
-                data_rules_fired[0][0]["agreements"] = []
-                data_rules_fired[0][0]["null_equivalent"] = False
-                for rule in fuzzy_rules["cell"]["data"].keys():
+                data_rules_fired[0][0] = CellEvidence()
+                agreement_ids = []
+                for rule_index, rule in active_data_rules:
                     rule_fired = False
                     non_empty_patterns = 0
                     if (
-                        rule not in ignore_rules["cell"]["data"]
-                        and len(column_patterns) > 0
+                        len(column_patterns) > 0
                         and first_value.lower() not in pat_util.null_equivalent_values
                     ):
                         for pattern in column_patterns:
@@ -3247,10 +3378,33 @@ def predict_subheaders_new(
                                 len(column_values),
                             )
                             if rule_fired == True and "_REPEATS_" not in rule:
-                                data_rules_fired[0][0]["agreements"].append(rule)
+                                data_rules_fired[0][0].agreements.append(rule)
+                                agreement_ids.append(rule_index)
+
+                #######################################################################v######
+                #  DATA value classification
+                data_score = max_rule_weight(data_cell_weights, agreement_ids)
+                POPULATION_WEIGHT = 1 - (1 - args.p) ** (2 * summary_strength)
+                if data_score != None:
+                    if args.summary_population_factor:
+                        cell_data_score = data_score * POPULATION_WEIGHT
+                    else:
+                        cell_data_score = data_score
 
                 value_disagreements = []
+                disagreement_ids = []
                 disagreement_summary_strength = summary_strength - 1
+
+                # the not data score cannot exceed the strongest not data rule,
+                # skip the not data rules when the data score already wins
+                not_data_score_bound = not_data_cell_score_bound(
+                    max_not_data_weight, disagreement_summary_strength, args
+                )
+                if (
+                    cell_data_score > not_data_score_bound
+                ):  # candidate subheader is definitely data, move along
+                    continue
+
                 if len(pattern) > 0:
                     repetitions_of_candidate = column_values[1:].count(first_value)
                     neighbor = ""
@@ -3260,11 +3414,10 @@ def predict_subheaders_new(
                     except:
                         repetitions_of_neighbor = 0
 
-                    for rule in fuzzy_rules["cell"]["not_data"].keys():
+                    for rule_index, rule in active_not_data_rules:
                         rule_fired = False
                         if (
-                            rule not in ignore_rules["cell"]["not_data"]
-                            and disagreement_summary_strength > 0
+                            disagreement_summary_strength > 0
                             and (
                                 all_numbers(column_symbols) == False
                                 or is_number(symbols) == False
@@ -3292,27 +3445,12 @@ def predict_subheaders_new(
                             )
                             if rule_fired == True and "_REPEATS_" not in rule:
                                 value_disagreements.append(rule)
-
-                #######################################################################v######
-                #  DATA value classification
-                data_score = max_score(
-                    data_rules_fired[0][0]["agreements"],
-                    fuzzy_rules["cell"]["data"],
-                    args.weight_lower_bound,
-                )
-                POPULATION_WEIGHT = 1 - (1 - args.p) ** (2 * summary_strength)
-                if data_score != None:
-                    if args.summary_population_factor:
-                        cell_data_score = data_score * POPULATION_WEIGHT
-                    else:
-                        cell_data_score = data_score
+                                disagreement_ids.append(rule_index)
 
                 #######################################################################v######
                 #  NOT DATA value classification
-                not_data_score = max_score(
-                    value_disagreements,
-                    fuzzy_rules["cell"]["not_data"],
-                    args.not_data_weight_lower_bound,
+                not_data_score = max_rule_weight(
+                    not_data_cell_weights, disagreement_ids
                 )
                 POPULATION_WEIGHT = 1 - (1 - args.p) ** (
                     2 * disagreement_summary_strength
@@ -3329,17 +3467,18 @@ def predict_subheaders_new(
                     continue
 
                 if (
-                    row.Index - 1 in predicted_pat_sub_headers
-                    and row.Index - 2 in predicted_pat_sub_headers
+                    line_label - 1 in predicted_pat_sub_header_set
+                    and line_label - 2 in predicted_pat_sub_header_set
                 ):
                     continue
 
-                if row.Index != cand_data.index[-1]:
-                    predicted_pat_sub_headers.append(row.Index)
+                if line_label != cand_data.index[-1]:
+                    predicted_pat_sub_headers.append(line_label)
+                    predicted_pat_sub_header_set.add(line_label)
 
     # print(f'predicted_pat_sub_headers={predicted_pat_sub_headers}')
     for s_i, subheader in enumerate(predicted_pat_sub_headers):
-        if subheader not in subheader_scope.keys():
+        if subheader not in subheader_scope:
             if s_i + 1 == len(predicted_pat_sub_headers):
                 subheader_scope[subheader] = list(
                     range(subheader + 1, cand_data.index[-1] + 1)
@@ -3375,9 +3514,10 @@ def predict_last_data_line_top_down(
     args = model.parameters
     fuzzy_rules = model.fuzzy_rules
 
-    predicted_pat_sub_headers = list(subheader_scope.keys())
+    predicted_pat_sub_headers = set(subheader_scope)
     certain_data = []
-    certain_data_widths = []
+    # widest line accepted as data so far
+    max_certain_data_width = None
     data_predictions = dict()
 
     data_rules_fired = {}
@@ -3385,7 +3525,8 @@ def predict_last_data_line_top_down(
     predicted_ldl = predicted_fdl
     predicted_subheaders = []
 
-    data = pd.DataFrame()
+    # labels of the lines accepted as data so far
+    data_labels = set()
     candidate_data = dataframe.loc[predicted_fdl:]
     probation = []
 
@@ -3396,8 +3537,31 @@ def predict_last_data_line_top_down(
         slice_idx = min(max_attributes, candidate_data.shape[1]) + 1
         candidate_data = candidate_data.iloc[:, :slice_idx]
 
+    data_cell_weights = rule_weight_array(
+        fuzzy_rules["cell"]["data"], args.weight_lower_bound
+    )
+    not_data_cell_weights = rule_weight_array(
+        fuzzy_rules["cell"]["not_data"], args.not_data_weight_lower_bound
+    )
+
+    data_line_weights = line_rule_weights(
+        fuzzy_rules["line"]["data"], args.weight_lower_bound
+    )
+    not_data_line_weights = not_data_line_event_weights(
+        fuzzy_rules["line"]["not_data"], args.not_data_weight_lower_bound
+    )
+    use_line_weights = args.weight_input == "values_and_lines"
+    summary_population_factor = args.summary_population_factor
+
+    # scratch buffer for the cell scores and line weights of a line
+    n_columns = candidate_data.shape[1]
+    evidence_buffer = np.empty(
+        n_columns
+        + max(len(fuzzy_rules["line"]["data"]), len(fuzzy_rules["line"]["not_data"]))
+    )
+
     line_counter = 0
-    patterns = Patterns()
+    patterns = Patterns(n_columns)
     for line_label, line in candidate_data.iterrows():
         line_counter += 1
         row_values = [str(elem) if elem is not None else elem for elem in line.tolist()]
@@ -3414,6 +3578,7 @@ def predict_last_data_line_top_down(
         # print(f'\n---------------\nLINE {line_label}: IS_DATA init {IS_DATA}')
         # print(f'{row_values}')
         if line_label not in blank_lines:
+            line_width = non_empty_values(line)
             if line_label in certain_data:
                 IS_DATA = True
                 # print(f'(1) IS_DATA = True')
@@ -3518,8 +3683,12 @@ def predict_last_data_line_top_down(
             if (
                 line_counter <= 3 or line_label in aggregation_rows
             ):  # and line_predictions[line_label]['label']=='DATA':
-                data = pd.DataFrame([line], index=[line_label]).append(data)
-                certain_data_widths.append(non_empty_values(line))
+                data_labels.add(line_label)
+                if (
+                    max_certain_data_width == None
+                    or line_width > max_certain_data_width
+                ):
+                    max_certain_data_width = line_width
                 predicted_ldl = line_label
                 data_conf = 1
                 prediction, _ = predict_line_label(data_conf, not_data_conf)
@@ -3546,124 +3715,105 @@ def predict_last_data_line_top_down(
                         line,
                         predicted_fdl,
                         line_label,
-                        data,
+                        len(data_labels),
                         signatures,
                         model,
                         data_rules_fired,
                         not_data_rules_fired,
                         patterns,
                     )
-                    candidate_row_agreements = []
-                    candidate_row_disagreements = []
-                    for column in candidate_data:
-                        #################################################v######################v######
-                        #  DATA value classification
-                        value_agreements = data_rules_fired[line_label][column][
-                            "agreements"
-                        ]
-                        summary_strength = data_rules_fired[line_label][column][
-                            "summary_strength"
-                        ]
-
-                        data_score = max_score(
-                            value_agreements,
-                            fuzzy_rules["cell"]["data"],
-                            args.weight_lower_bound,
+                    #################################################v######################v######
+                    #  DATA value classification, all columns of the line at once
+                    data_scores = masked_max_scores(
+                        data_rules_fired[line_label]["agreement_matrix"],
+                        data_cell_weights,
+                    )
+                    if summary_population_factor:
+                        summary_strengths = np.array(
+                            [
+                                data_rules_fired[line_label][column].summary_strength
+                                for column in candidate_data
+                            ]
                         )
-                        POPULATION_WEIGHT = 1 - (1 - args.p) ** (2 * summary_strength)
-                        if data_score != None:
-                            if args.summary_population_factor:
-                                candidate_row_agreements.append(
-                                    data_score * POPULATION_WEIGHT
-                                )
-                            else:
-                                candidate_row_agreements.append(data_score)
-                        #######################################################################v######
-                        #  NOT DATA value classification
-                        value_disagreements = not_data_rules_fired[line_label][column][
-                            "disagreements"
-                        ]
-                        disagreement_summary_strength = not_data_rules_fired[
-                            line_label
-                        ][column]["disagreement_summary_strength"]
-                        not_data_score = max_score(
-                            value_disagreements,
-                            fuzzy_rules["cell"]["not_data"],
-                            args.not_data_weight_lower_bound,
+                        data_scores = data_scores * population_weights(
+                            args.p, summary_strengths
                         )
-                        POPULATION_WEIGHT = 1 - (1 - args.p) ** (
-                            2 * disagreement_summary_strength
+                    #######################################################################v######
+                    #  NOT DATA value classification, all columns of the line at once
+                    not_data_scores = masked_max_scores(
+                        not_data_rules_fired[line_label]["disagreement_matrix"],
+                        not_data_cell_weights,
+                    )
+                    if summary_population_factor:
+                        disagreement_summary_strengths = np.array(
+                            [
+                                not_data_rules_fired[line_label][
+                                    column
+                                ].disagreement_summary_strength
+                                for column in candidate_data
+                            ]
+                        )
+                        not_data_scores = not_data_scores * population_weights(
+                            args.p, disagreement_summary_strengths
                         )
-
-                        if not_data_score != None:
-                            if args.summary_population_factor:
-                                candidate_row_disagreements.append(
-                                    not_data_score * POPULATION_WEIGHT
-                                )
-                            else:
-                                candidate_row_disagreements.append(not_data_score)
                     #################################################################################
                     # NOT DATA line weights
-                    line_not_data_evidence = [
-                        score for score in candidate_row_disagreements
-                    ]
-                    if args.weight_input == "values_and_lines":
-                        if candidate_data.shape[1] > 1:
+                    # zero evidence leaves the probabilistic sum unchanged
+                    not_data_scores = not_data_scores[not_data_scores > 0]
+                    evidence_size = len(not_data_scores)
+                    evidence_buffer[:evidence_size] = not_data_scores
+                    if use_line_weights:
+                        if n_columns > 1:
                             not_data_line_rules_fired = downwards_not_data_rules_fired[
                                 line_label
                             ]["line"]
+                            if n_columns + len(not_data_line_rules_fired) > len(
+                                evidence_buffer
+                            ):
+                                evidence_buffer = np.resize(
+                                    evidence_buffer,
+                                    n_columns + len(not_data_line_rules_fired),
+                                )
                             for event in not_data_line_rules_fired:
                                 if event == "UP_TO_FIRST_COLUMN_COMPLETE_CONSISTENTLY":
                                     continue
-                                if (
-                                    event.startswith("ADJACENT_ARITHMETIC_SEQUENCE")
-                                    and fuzzy_rules["line"]["not_data"][event]["weight"]
-                                    == None
-                                ):
-                                    steps = event[-1]
-                                    if steps.isdigit() and int(steps) in range(2, 6):
-                                        event = event[:-1] + str(int(steps) + 1)
-                                if (
-                                    event in fuzzy_rules["line"]["not_data"].keys()
-                                    and fuzzy_rules["line"]["not_data"][event]["weight"]
-                                    != None
-                                    and fuzzy_rules["line"]["not_data"][event]["weight"]
-                                    > args.not_data_weight_lower_bound
-                                ):
-                                    line_not_data_evidence.append(
-                                        fuzzy_rules["line"]["not_data"][event]["weight"]
-                                    )
-
-                    not_data_conf = probabilistic_sum(line_not_data_evidence)
+                                weight = not_data_line_weights.get(event)
+                                if weight != None:
+                                    evidence_buffer[evidence_size] = weight
+                                    evidence_size += 1
+
+                    not_data_conf = probabilistic_sum_buffer(
+                        evidence_buffer, evidence_size
+                    )
 
                     # DATA line weights
-                    line_is_data_evidence = [
-                        score for score in candidate_row_agreements
-                    ]
-                    if args.weight_input == "values_and_lines":
+                    data_scores = data_scores[data_scores > 0]
+                    evidence_size = len(data_scores)
+                    evidence_buffer[:evidence_size] = data_scores
+                    if use_line_weights:
                         line_is_data_events = downwards_data_rules_fired[line_label][
                             "line"
                         ]
+                        if n_columns + len(line_is_data_events) > len(evidence_buffer):
+                            evidence_buffer = np.resize(
+                                evidence_buffer, n_columns + len(line_is_data_events)
+                            )
                         for rule in line_is_data_events:
-                            if (
-                                fuzzy_rules["line"]["data"][rule]["weight"] != None
-                                and fuzzy_rules["line"]["data"][rule]["weight"]
-                                > args.weight_lower_bound
-                            ):
-                                line_is_data_evidence.append(
-                                    fuzzy_rules["line"]["data"][rule]["weight"]
-                                )
+                            weight = data_line_weights.get(rule)
+                            if weight != None:
+                                evidence_buffer[evidence_size] = weight
+                                evidence_size += 1
                     # calculate confidence that this row is data
-                    data_conf = probabilistic_sum(line_is_data_evidence)
+                    data_conf = probabilistic_sum_buffer(evidence_buffer, evidence_size)
 
                     # print(f'{line_label}: \n\t-data_conf={data_conf}\n\t-not_data_conf={not_data_conf}')
                     if data_conf > 0 and data_conf >= not_data_conf:
                         IS_DATA = True
                         # print(f'(3) IS_DATA = True (data_conf>0 and data_conf>=not_data_conf)')
                     elif (
-                        len(certain_data_widths) > 0
-                        and non_empty_values(line) == max(certain_data_widths)
-                        and line_label - 1 in data.index
+                        max_certain_data_width != None
+                        and line_width == max_certain_data_width
+                        and line_label - 1 in data_labels
                     ):  # TODO refactor as rule
                         IS_DATA = True
                         # print(f'(4) IS_DATA = True')
@@ -3695,8 +3845,12 @@ def predict_last_data_line_top_down(
 
             elif IS_DATA == True:
                 predicted_ldl = line_label
-                data = pd.DataFrame([line], index=[line_label]).append(data)
-                certain_data_widths.append(non_empty_values(line))
+                data_labels.add(line_label)
+                if (
+                    max_certain_data_width == None
+                    or line_width > max_certain_data_width
+                ):
+                    max_certain_data_width = line_width
 
             else:
                 break
@@ -3714,12 +3868,133 @@ def predict_last_data_line_top_down(
     return predicted_ldl, bottom_boundary_confidence
 
 
-class Patterns:
+class CellEvidence:
+    """Rules fired on a cell and the cell features the classifiers read."""
+
+    __slots__ = (
+        "agreements",
+        "disagreements",
+        "agreement_mask",
+        "disagreement_mask",
+        "summary_strength",
+        "disagreement_summary_strength",
+        "null_equivalent",
+        "aggregate",
+    )
+
     def __init__(self):
-        self.data = dict()
-        self.not_data = dict()
+        self.agreements = []
+        self.disagreements = []
+        self.agreement_mask = None
+        self.disagreement_mask = None
+        self.summary_strength = 0
+        self.disagreement_summary_strength = 0
+        self.null_equivalent = False
+        self.aggregate = False
+
+
+class DataframeEvidence:
+    """Cell evidence of a block of rows as [row position, column] arrays.
+
+    The rules fired on each cell are kept as boolean masks over the rule
+    positions, agreements[row position, column, rule position] is True when
+    the data rule at that position fired on the cell.
+    """
+
+    __slots__ = (
+        "summary_strength",
+        "disagreement_summary_strength",
+        "null_equivalent",
+        "aggregate",
+        "agreements",
+        "disagreements",
+    )
+
+    def __init__(
+        self,
+        data_rules_fired,
+        not_data_rules_fired,
+        row_indexes,
+        column_indexes,
+        fuzzy_rules,
+    ):
+        n_rows = len(row_indexes)
+        n_columns = len(column_indexes)
+        column_positions = np.asarray(column_indexes)
+
+        self.summary_strength = np.zeros((n_rows, n_columns), dtype=np.int32)
+        self.disagreement_summary_strength = np.zeros(
+            (n_rows, n_columns), dtype=np.int32
+        )
+        self.null_equivalent = np.zeros((n_rows, n_columns), dtype=bool)
+        self.aggregate = np.zeros((n_rows, n_columns), dtype=bool)
+        self.agreements = np.zeros(
+            (n_rows, n_columns, len(fuzzy_rules["cell"]["data"])), dtype=bool
+        )
+        self.disagreements = np.zeros(
+            (n_rows, n_columns, len(fuzzy_rules["cell"]["not_data"])), dtype=bool
+        )
+
+        for row_position, row_index in enumerate(row_indexes):
+            data_row = data_rules_fired[row_index]
+            not_data_row = not_data_rules_fired[row_index]
+            self.agreements[row_position] = data_row["agreement_matrix"][
+                column_positions
+            ]
+            self.disagreements[row_position] = not_data_row["disagreement_matrix"][
+                column_positions
+            ]
+            for column_position, column_index in enumerate(column_indexes):
+                data_cell = data_row[column_index]
+                self.summary_strength[
+                    row_position, column_position
+                ] = data_cell.summary_strength
+                self.disagreement_summary_strength[
+                    row_position, column_position
+                ] = not_data_row[column_index].disagreement_summary_strength
+                self.null_equivalent[
+                    row_position, column_position
+                ] = data_cell.null_equivalent
+                self.aggregate[row_position, column_position] = data_cell.aggregate
+
+
+class Patterns:
+    """Incremental column summaries, kept as parallel per-column lists.
+
+    The data patterns summarize a window that includes the cell being
+    classified, the not data patterns the window right below it.
+    """
+
+    def __init__(self, n_columns=0):
         self.summary = dict()
 
+        self.data_initialized = [False] * n_columns
+        self.train = [None] * n_columns
+        self.bw_train = [None] * n_columns
+        self.symbolset = [None] * n_columns
+        self.case = [None] * n_columns
+        self.character_length = [None] * n_columns
+        self.summary_strength = [0] * n_columns
+        self.candidate_count = [None] * n_columns
+        self.consistent_symbol_sets = [None] * n_columns
+        self.column_is_numeric = [None] * n_columns
+        self.partof_multiword_value_repeats = [None] * n_columns
+        # data cell rules fired, memoized on data_cell_rule_key
+        self.rule_cache = [None] * n_columns
+        self.last_rule_key = [None] * n_columns
+        self.last_rules_fired = [None] * n_columns
+
+        self.not_data_initialized = [False] * n_columns
+        self.not_data_train = [None] * n_columns
+        self.not_data_bw_train = [None] * n_columns
+        self.not_data_symbolset = [None] * n_columns
+        self.not_data_case = [None] * n_columns
+        self.not_data_character_length = [None] * n_columns
+        self.not_data_all_numbers = [None] * n_columns
+        self.disagreement_summary_strength = [0] * n_columns
+        self.not_data_candidate_count = [None] * n_columns
+        self.neighbor_count = [None] * n_columns
+
     def data_initialize(
         self,
         column_index,
@@ -3735,44 +4010,37 @@ class Patterns:
         column_is_numeric_train,
         max_values_lookahead,
     ):
-
-        self.data[column_index] = dict()
-        self.data[column_index]["train"] = pat_util.generate_pattern_summary(
-            column_trains
-        )
-        self.data[column_index]["bw_train"] = pat_util.generate_pattern_summary(
+        self.data_initialized[column_index] = True
+        self.rule_cache[column_index] = dict()
+        self.last_rule_key[column_index] = None
+        self.last_rules_fired[column_index] = None
+        self.train[column_index] = pat_util.generate_pattern_summary(column_trains)
+        self.bw_train[column_index] = pat_util.generate_pattern_summary(
             column_bw_trains
         )
-        self.data[column_index]["symbolset"] = pat_util.generate_symbol_summary(
-            column_symbols
-        )
-        self.data[column_index]["case"] = pat_util.generate_case_summary(column_cases)
-        self.data[column_index]["character_length"] = pat_util.generate_length_summary(
+        self.symbolset[column_index] = pat_util.generate_symbol_summary(column_symbols)
+        self.case[column_index] = pat_util.generate_case_summary(column_cases)
+        self.character_length[column_index] = pat_util.generate_length_summary(
             column_char_lengths
         )
-        self.data[column_index]["summary_strength"] = sum(
+        self.summary_strength[column_index] = sum(
             1 for x in column_trains if len(x) > 0
         )
-        self.data[column_index]["candidate_count"] = dict()
-        self.data[column_index]["candidate_count"][value] = np.count_nonzero(
+        self.candidate_count[column_index] = dict()
+        self.candidate_count[column_index][value] = np.count_nonzero(
             column_values[2 : min(max_values_lookahead, len(column_values))] == value
         )
-        self.data[column_index]["consistent_symbol_sets"] = is_consistent_symbol_sets(
+        self.consistent_symbol_sets[column_index] = is_consistent_symbol_sets(
             column_symbols
         )
-        self.data[column_index][
-            "column_is_numeric"
+        self.column_is_numeric[
+            column_index
         ] = pat_util.generate_all_numeric_sig_pattern(
             column_is_numeric_train, [len(t) for t in column_trains]
         )
-        self.data[column_index][
-            "partof_multiword_value_repeats"
-        ] = dict()  # TODO check if this contributes to quadratic? ^o^
-        for part in candidate_tokens:
-            self.data[column_index]["partof_multiword_value_repeats"][part] = 0
-            for value_tokens in column_tokens:
-                if part in value_tokens:
-                    self.data[column_index]["partof_multiword_value_repeats"][part] += 1
+        self.partof_multiword_value_repeats[
+            column_index
+        ] = pat_util.count_token_repeats(candidate_tokens, column_tokens)
 
     def generate_column_patterns(self, column_series, outlier_sensitive=True):
         signatures = TableSignatures(column_series, outlier_sensitive)
@@ -3792,115 +4060,129 @@ class Patterns:
             signatures.all_column_character_lengths
         )
 
-    def data_increment(
+    def update_data(
         self,
         column_index,
         value,
+        candidate_tokens,
+        column_values,
+        column_tokens,
+        column_trains,
+        column_symbols,
+        signatures_slice,
         train_sig,
         bw_train_sig,
         symbol_sig,
         case,
         num_chars_sig,
         numeric_train_sig,
-        candidate_tokens,
+        max_values_lookahead,
     ):
+        # summarize the window INCLUDING the cell on the first line of a column,
+        # afterwards extend the summaries with the new cell
+        if self.data_initialized[column_index] == False:
+            self.data_initialize(
+                column_index,
+                value,
+                candidate_tokens,
+                column_values,
+                column_tokens,
+                column_trains,
+                signatures_slice.all_column_bw_train[:, column_index],
+                column_symbols,
+                signatures_slice.all_column_cases[:, column_index],
+                signatures_slice.all_column_character_lengths[:, column_index],
+                signatures_slice.all_column_is_numeric_train[:, column_index],
+                max_values_lookahead,
+            )
+            return
 
-        self.data[column_index]["train"] = pat_util.train_incremental_pattern(
-            self.data[column_index]["train"], train_sig
+        self.train[column_index] = pat_util.train_incremental_pattern(
+            self.train[column_index], train_sig
         )
-        self.data[column_index]["bw_train"] = pat_util.train_incremental_pattern(
-            self.data[column_index]["bw_train"], bw_train_sig
+        self.bw_train[column_index] = pat_util.train_incremental_pattern(
+            self.bw_train[column_index], bw_train_sig
         )
-        self.data[column_index]["symbolset"] = pat_util.symbolset_incremental_pattern(
-            self.data[column_index]["symbolset"], symbol_sig
+        self.symbolset[column_index] = pat_util.symbolset_incremental_pattern(
+            self.symbolset[column_index], symbol_sig
         )
-        self.data[column_index]["case"] = pat_util.case_incremental_pattern(
-            self.data[column_index]["case"], case
+        self.case[column_index] = pat_util.case_incremental_pattern(
+            self.case[column_index], case
         )
-        self.data[column_index][
-            "character_length"
-        ] = pat_util.charlength_incremental_pattern(
-            self.data[column_index]["character_length"], num_chars_sig
+        self.character_length[column_index] = pat_util.charlength_incremental_pattern(
+            self.character_length[column_index], num_chars_sig
         )
-        self.data[column_index][
-            "summary_strength"
-        ] = pat_util.summary_strength_increment(
-            self.data[column_index]["summary_strength"], train_sig
+        self.summary_strength[column_index] = pat_util.summary_strength_increment(
+            self.summary_strength[column_index], train_sig
         )
-        self.data[column_index]["candidate_count"] = pat_util.candidate_count_increment(
-            self.data[column_index]["candidate_count"], value
+        self.candidate_count[column_index] = pat_util.candidate_count_increment(
+            self.candidate_count[column_index], value
         )
-        self.data[column_index][
-            "partof_multiword_value_repeats"
+        self.partof_multiword_value_repeats[
+            column_index
         ] = pat_util.token_repeats_increment(
-            self.data[column_index]["partof_multiword_value_repeats"], candidate_tokens
+            self.partof_multiword_value_repeats[column_index], candidate_tokens
         )
-        self.data[column_index][
-            "consistent_symbol_sets"
+        self.consistent_symbol_sets[
+            column_index
         ] = pat_util.consistent_symbol_sets_increment(
-            self.data[column_index]["consistent_symbol_sets"], symbol_sig
+            self.consistent_symbol_sets[column_index], symbol_sig
         )
-        self.data[column_index][
-            "column_is_numeric"
+        self.column_is_numeric[
+            column_index
         ] = pat_util.numeric_train_incremental_pattern(
-            numeric_train_sig,
-            len(train_sig),
-            self.data[column_index]["column_is_numeric"],
-        )
-
-    def not_data_initialize(
-        self,
-        column_index,
-        column_trains,
-        column_bw_trains,
-        column_symbols,
-        column_cases,
-        column_char_lengths,
-        column_isnumber,
-        train_sig,
-        signatures_slice,
-    ):
-        self.not_data[column_index] = dict()
-        self.not_data[column_index]["train"] = pat_util.generate_pattern_summary(
-            column_trains
-        )
-        self.not_data[column_index]["bw_train"] = pat_util.generate_pattern_summary(
-            column_bw_trains
-        )
-        self.not_data[column_index]["symbolset"] = pat_util.generate_symbol_summary(
-            column_symbols
+            numeric_train_sig, len(train_sig), self.column_is_numeric[column_index]
         )
-        self.not_data[column_index]["case"] = pat_util.generate_case_summary(
-            column_cases
-        )
-        self.not_data[column_index][
-            "character_length"
-        ] = pat_util.generate_length_summary(column_char_lengths)
-        self.not_data[column_index]["all_numbers"] = np.all(column_isnumber)
-        self.not_data[column_index]["disagreement_summary_strength"] = sum(
-            1 for x in column_trains if len(x) > 0
-        )
-
-        self.not_data[column_index]["candidate_count"] = dict()
-        self.not_data[column_index]["neighbor_count"] = dict()
 
-        if len(train_sig) > 0:
-            value = signatures_slice.all_normalized_values[0, column_index]
-            self.not_data[column_index]["candidate_count"][value] = 0
-            context_values = signatures_slice.all_normalized_values[1:, column_index]
-            self.not_data[column_index]["candidate_count"][value] = np.count_nonzero(
-                context_values[1:] == value
+    def update_not_data(self, column_index, train_sig, signatures_slice):
+        # summarize the window BELOW the cell on the first line of a column,
+        # afterwards extend the summaries with the cell below
+        if self.not_data_initialized[column_index] == False:
+            self.not_data_initialized[column_index] = True
+            column_trains = signatures_slice.train_normalized_numbers[1:, column_index]
+            self.not_data_train[column_index] = pat_util.generate_pattern_summary(
+                column_trains
             )
-            neighbor = ""
-            try:
-                neighbor = context_values[1]
-                self.not_data[column_index]["neighbor_count"][
-                    neighbor
-                ] = np.count_nonzero(context_values[2:] == neighbor)
-            except:
-                self.not_data[column_index]["neighbor_count"][neighbor] = 0
+            self.not_data_bw_train[column_index] = pat_util.generate_pattern_summary(
+                signatures_slice.all_column_bw_train[1:, column_index]
+            )
+            self.not_data_symbolset[column_index] = pat_util.generate_symbol_summary(
+                signatures_slice.symbolset_normalized_numbers[1:, column_index]
+            )
+            self.not_data_case[column_index] = pat_util.generate_case_summary(
+                signatures_slice.all_column_cases[1:, column_index]
+            )
+            self.not_data_character_length[
+                column_index
+            ] = pat_util.generate_length_summary(
+                signatures_slice.all_column_character_lengths[1:, column_index]
+            )
+            self.not_data_all_numbers[column_index] = np.all(
+                signatures_slice.all_column_isnumber[1:, column_index]
+            )
+            self.disagreement_summary_strength[column_index] = sum(
+                1 for x in column_trains if len(x) > 0
+            )
+
+            self.not_data_candidate_count[column_index] = dict()
+            self.neighbor_count[column_index] = dict()
 
-    def not_data_increment(self, column_index, signatures_slice):
+            if len(train_sig) > 0:
+                value = signatures_slice.all_normalized_values[0, column_index]
+                context_values = signatures_slice.all_normalized_values[
+                    1:, column_index
+                ]
+                # one counting pass serves the candidate and the neighbor below it
+                value_counts = Counter(context_values[1:].tolist())
+                self.not_data_candidate_count[column_index][value] = value_counts[
+                    value
+                ]
+                if len(context_values) > 1:
+                    neighbor = context_values[1]
+                    self.neighbor_count[column_index][neighbor] = (
+                        value_counts[neighbor] - 1
+                    )
+            return
 
         last_train = signatures_slice.train_normalized_numbers[1, column_index]
         last_bw_train_sig = signatures_slice.all_column_bw_train[1, column_index]
@@ -3912,61 +4194,54 @@ class Patterns:
         ]
         last_is_number = signatures_slice.all_column_isnumber[1, column_index]
 
-        self.not_data[column_index]["train"] = pat_util.train_incremental_pattern(
-            self.not_data[column_index]["train"], last_train
+        self.not_data_train[column_index] = pat_util.train_incremental_pattern(
+            self.not_data_train[column_index], last_train
         )
-        self.not_data[column_index]["bw_train"] = pat_util.train_incremental_pattern(
-            self.not_data[column_index]["bw_train"], last_bw_train_sig
+        self.not_data_bw_train[column_index] = pat_util.train_incremental_pattern(
+            self.not_data_bw_train[column_index], last_bw_train_sig
         )
-        self.not_data[column_index][
-            "symbolset"
-        ] = pat_util.symbolset_incremental_pattern(
-            self.not_data[column_index]["symbolset"], last_symbol_sig
+        self.not_data_symbolset[column_index] = pat_util.symbolset_incremental_pattern(
+            self.not_data_symbolset[column_index], last_symbol_sig
         )
-        self.not_data[column_index]["case"] = pat_util.case_incremental_pattern(
-            self.not_data[column_index]["case"], last_case
+        self.not_data_case[column_index] = pat_util.case_incremental_pattern(
+            self.not_data_case[column_index], last_case
         )
-        self.not_data[column_index][
-            "character_length"
+        self.not_data_character_length[
+            column_index
         ] = pat_util.charlength_incremental_pattern(
-            self.not_data[column_index]["character_length"], last_num_chars_sig
+            self.not_data_character_length[column_index], last_num_chars_sig
         )
 
         if len(last_symbol_sig) > 0:
-            self.not_data[column_index]["all_numbers"] = np.all(
-                [self.not_data[column_index]["all_numbers"], last_is_number]
+            self.not_data_all_numbers[column_index] = bool(
+                self.not_data_all_numbers[column_index] and last_is_number
             )
 
         if len(last_train) > 0:
-            self.not_data[column_index]["disagreement_summary_strength"] + 1
+            self.disagreement_summary_strength[column_index] += 1
 
         train_sig = signatures_slice.train_normalized_numbers[0, column_index]
         value = signatures_slice.all_normalized_values[0, column_index]
 
         if len(train_sig) > 0:
             context_values = signatures_slice.all_normalized_values[1:, column_index]
-            self.not_data[column_index][
-                "candidate_count"
+            self.not_data_candidate_count[
+                column_index
             ] = pat_util.candidate_count_increment(
-                self.not_data[column_index]["candidate_count"], value
+                self.not_data_candidate_count[column_index], value
             )
-            neighbor = ""
-            try:
+            if len(context_values) > 1:
                 neighbor = context_values[1]
-                self.not_data[column_index][
-                    "neighbor_count"
-                ] = pat_util.candidate_count_increment(
-                    self.not_data[column_index]["neighbor_count"], neighbor
+                self.neighbor_count[column_index] = pat_util.candidate_count_increment(
+                    self.neighbor_count[column_index], neighbor
                 )
-            except:
-                self.not_data[column_index]["neighbor_count"] = 0
 
 
 def collect_line_rules(
     line,
     predicted_fdl,
     line_label,
-    data,
+    data_line_count,
     signatures,
     model,
     line_agreements,
@@ -3976,29 +4251,36 @@ def collect_line_rules(
     # print(signatures.preview())
     args = model.parameters
     ignore_rules = model.ignore_rules
+    cell_rule_evaluators = model.cell_rule_evaluators(model.exact)
+    evaluate_data_rules = cell_rule_evaluators["data"]
+    evaluate_not_data_rules = cell_rule_evaluators["not_data"]
     signatures_slice = signatures.reverse_slice(top=predicted_fdl, bottom=line_label)
 
     # row_values = [str(elem) if elem is not None else elem for elem in line.values]
     # null_equivalent_fired, times = line_has_null_equivalent(row_values)
-    null_equivalent_fired = False
-    times = sum(
-        signatures.is_null_equivalent[line_label, :]
-    )  # this wont work, it has all null equivalent, we care about strictly nulls
-    if times > 0:
-        null_equivalent_fired = True
+    # this wont work, it has all null equivalent, we care about strictly nulls
+    null_equivalent_fired = bool(signatures.is_null_equivalent[line_label, :].any())
 
     all_summaries_empty = True
-    max_values_lookahead = data.shape[0]
+    max_values_lookahead = data_line_count
     coherent_cells = dict()
     incoherent_cells = dict()
+    # rules fired per [column, rule position], each cell's mask is a row view
+    agreement_matrix = np.zeros(
+        (len(line.index), len(model.fuzzy_rules["cell"]["data"])), dtype=bool
+    )
+    disagreement_matrix = np.zeros(
+        (len(line.index), len(model.fuzzy_rules["cell"]["not_data"])), dtype=bool
+    )
     for column_index, column in enumerate(line.index):
-        coherent_cells[column] = {}
-        incoherent_cells[column] = {}
-        coherent_cells[column]["agreements"] = []
-        incoherent_cells[column]["disagreements"] = []
+        coherent_cells[column] = CellEvidence()
+        incoherent_cells[column] = CellEvidence()
+        coherent_cells[column].agreement_mask = agreement_matrix[column_index]
+        incoherent_cells[column].disagreement_mask = disagreement_matrix[
+            column_index
+        ]
         value = signatures.all_normalized_values[line_label, column_index]
         value_lower = value.lower()
-        value_tokens = signatures.all_column_tokens[line_label, column_index]
         is_aggregate = signatures.is_aggregate[
             line_label, column_index
         ]  # (len(value_tokens)>0 and not set(value_tokens).isdisjoint(pat_util.aggregation_tokens))
@@ -4018,65 +4300,48 @@ def collect_line_rules(
             line_label, column_index
         ]
         is_number = signatures.all_column_isnumber[line_label, column_index]
-        coherent_cells[column]["null_equivalent"] = is_null_equivalent
-        coherent_cells[column]["aggregate"] = is_aggregate
+        coherent_cells[column].null_equivalent = is_null_equivalent
+        coherent_cells[column].aggregate = is_aggregate
 
         column_values = signatures_slice.all_normalized_values[:, column_index]
         column_tokens = signatures_slice.all_column_tokens[:, column_index]
-        candidate_tokens = set([t for t in value_tokens if any(c.isalpha() for c in t)])
+        candidate_tokens = signatures.alpha_tokens[line_label, column_index]
         column_trains = signatures_slice.train_normalized_numbers[:, column_index]
         column_symbols = signatures_slice.symbolset_normalized_numbers[:, column_index]
-        column_bw_trains = signatures_slice.all_column_bw_train[:, column_index]
-        column_cases = signatures_slice.all_column_cases[:, column_index]
-        column_char_lengths = signatures_slice.all_column_character_lengths[
-            :, column_index
-        ]
-        column_is_numeric_train = signatures_slice.all_column_is_numeric_train[
-            :, column_index
+
+        patterns.update_data(
+            column_index,
+            value,
+            candidate_tokens,
+            column_values,
+            column_tokens,
+            column_trains,
+            column_symbols,
+            signatures_slice,
+            train_sig,
+            bw_train_sig,
+            symbol_sig,
+            case,
+            num_chars_sig,
+            numeric_train_sig,
+            max_values_lookahead,
+        )
+
+        # patterns of a window INCLUDING the cell we are on
+        value_pattern_summary, value_chain_consistent = patterns.train[column_index]
+        value_pattern_BW_summary, _ = patterns.bw_train[column_index]
+        value_symbol_summary = patterns.symbolset[column_index]
+        case_summary = patterns.case[column_index]
+        length_summary = patterns.character_length[column_index]
+        summary_strength = patterns.summary_strength[column_index]
+        candidate_count_of_value = patterns.candidate_count[column_index][value]
+        partof_multiword_value_repeats = patterns.partof_multiword_value_repeats[
+            column_index
         ]
+        consistent_symbol_sets, _ = patterns.consistent_symbol_sets[column_index]
+        train_sigs_all_numeric, _ = patterns.column_is_numeric[column_index]
 
-        if column_index not in patterns.data.keys():
-            patterns.data_initialize(
-                column_index,
-                value,
-                candidate_tokens,
-                column_values,
-                column_tokens,
-                column_trains,
-                column_bw_trains,
-                column_symbols,
-                column_cases,
-                column_char_lengths,
-                column_is_numeric_train,
-                max_values_lookahead,
-            )
-        else:
-            patterns.data_increment(
-                column_index,
-                value,
-                train_sig,
-                bw_train_sig,
-                symbol_sig,
-                case,
-                num_chars_sig,
-                numeric_train_sig,
-                candidate_tokens,
-            )
-
-        # patterns of a window INCLUDING the cell we are on
-        data_patterns = patterns.data[column_index]
-        value_pattern_summary, value_chain_consistent = data_patterns["train"]
-        value_pattern_BW_summary, _ = data_patterns["bw_train"]
-        value_symbol_summary = data_patterns["symbolset"]
-        case_summary = data_patterns["case"]
-        length_summary = data_patterns["character_length"]
-        summary_strength = data_patterns["summary_strength"]
-        candidate_count_of_value = data_patterns["candidate_count"][value]
-        partof_multiword_value_repeats = data_patterns["partof_multiword_value_repeats"]
-        consistent_symbol_sets, _ = data_patterns["consistent_symbol_sets"]
-        train_sigs_all_numeric, _ = data_patterns["column_is_numeric"]
-
-        coherent_cells[column]["summary_strength"] = summary_strength
+        coherent_cells[column].summary_strength = summary_strength
 
         if (
             null_equivalent_fired == True
@@ -4087,51 +4352,59 @@ def collect_line_rules(
         ):
             all_summaries_empty = False
 
-        for rule in model.fuzzy_rules["cell"]["data"].keys():
-            rule_fired = False
-            # Don't bother looking for coherency if there are no patterns or if the value on this line gives an empty pattern
-            # non_empty_patterns=0
-            if (
-                rule not in ignore_rules["cell"]["data"]
-                and len(column_trains) > 0
-                and is_null_equivalent == False
-            ):
-                # there is no point calculating agreement over one value, a single value always agrees with itself.
-                # in addition, many tables have bilingual headers, so agreement between two header values is very common, require nij>=3
-                if len(column_trains) >= 2 and summary_strength >= 2:
-                    rule_fired = eval_data_cell_rule(
-                        rule,
-                        column_values,
-                        column_tokens,
-                        value_pattern_summary,
-                        value_chain_consistent,
-                        value_pattern_BW_summary,
-                        value_symbol_summary,
-                        column_symbols,
-                        column_trains,
-                        case_summary,
-                        candidate_count_of_value,
-                        partof_multiword_value_repeats,
-                        candidate_tokens,
-                        consistent_symbol_sets,
-                        train_sigs_all_numeric,
-                        max_values_lookahead,
-                    )
-
-            if rule_fired == True:
-                coherent_cells[column]["agreements"].append(rule)
+        # Don't bother looking for coherency if there are no patterns or if the value on this line gives an empty pattern
+        # there is no point calculating agreement over one value, a single value always agrees with itself.
+        # in addition, many tables have bilingual headers, so agreement between two header values is very common, require nij>=3
+        if (
+            len(column_trains) >= 2
+            and is_null_equivalent == False
+            and summary_strength >= 2
+        ):
+            rule_key = data_cell_rule_key(
+                column_values,
+                value_pattern_summary,
+                value_chain_consistent,
+                value_pattern_BW_summary,
+                value_symbol_summary,
+                case_summary,
+                candidate_count_of_value,
+                partof_multiword_value_repeats,
+                candidate_tokens,
+                consistent_symbol_sets,
+                train_sigs_all_numeric,
+            )
+            if rule_key == patterns.last_rule_key[column_index]:
+                rules_fired = patterns.last_rules_fired[column_index]
+            elif rule_key in patterns.rule_cache[column_index]:
+                rules_fired = patterns.rule_cache[column_index][rule_key]
+            else:
+                rule_mask = coherent_cells[column].agreement_mask
+                agreements = evaluate_data_rules(
+                    rule_mask,
+                    column_values,
+                    column_tokens,
+                    value_pattern_summary,
+                    value_chain_consistent,
+                    value_pattern_BW_summary,
+                    value_symbol_summary,
+                    column_symbols,
+                    column_trains,
+                    case_summary,
+                    candidate_count_of_value,
+                    partof_multiword_value_repeats,
+                    candidate_tokens,
+                    consistent_symbol_sets,
+                    train_sigs_all_numeric,
+                    max_values_lookahead,
+                )
+                rules_fired = (tuple(agreements), np.flatnonzero(rule_mask))
+                patterns.rule_cache[column_index][rule_key] = rules_fired
+            patterns.last_rule_key[column_index] = rule_key
+            patterns.last_rules_fired[column_index] = rules_fired
+            coherent_cells[column].agreements = list(rules_fired[0])
+            coherent_cells[column].agreement_mask[rules_fired[1]] = 1
 
         ############################################ NOT DATA #####################################
-        column_values = signatures_slice.all_normalized_values[1:, column_index]
-        column_trains = signatures_slice.train_normalized_numbers[1:, column_index]
-        column_bw_trains = signatures_slice.all_column_bw_train[1:, column_index]
-        column_symbols = signatures_slice.symbolset_normalized_numbers[1:, column_index]
-        column_cases = signatures_slice.all_column_cases[1:, column_index]
-        column_char_lengths = signatures_slice.all_column_character_lengths[
-            1:, column_index
-        ]
-        column_isnumber = signatures_slice.all_column_isnumber[1:, column_index]
-
         new_value = value
         if "D" in symbol_sig and symbol_sig.issubset(
             set(["D", ".", ",", "S", "-", "+", "~", "(", ")"])
@@ -4146,91 +4419,196 @@ def collect_line_rules(
                 line_label, column_index
             ]
             ###############################################################################################
-        if column_index not in patterns.not_data.keys():
-            # initialize patterns
-            patterns.not_data_initialize(
-                column_index,
-                column_trains,
-                column_bw_trains,
-                column_symbols,
-                column_cases,
-                column_char_lengths,
-                column_isnumber,
-                train_sig,
-                signatures_slice,
-            )
-        else:
-            # increment patterns
-            patterns.not_data_increment(column_index, signatures_slice)
+        patterns.update_not_data(column_index, train_sig, signatures_slice)
 
         # patterns of a window that does NOT contain the cell we are on
-        not_data_patterns = patterns.not_data[column_index]
-        value_pattern_summary, value_chain_consistent = not_data_patterns["train"]
-        value_pattern_BW_summary, _ = not_data_patterns["bw_train"]
-        value_symbol_summary = not_data_patterns["symbolset"]
-        case_summary = not_data_patterns["case"]
-        length_summary = not_data_patterns["character_length"]
-        all_numbers_summary = not_data_patterns["all_numbers"]
-        disagreement_summary_strength = not_data_patterns[
-            "disagreement_summary_strength"
+        value_pattern_summary, value_chain_consistent = patterns.not_data_train[
+            column_index
+        ]
+        value_pattern_BW_summary, _ = patterns.not_data_bw_train[column_index]
+        value_symbol_summary = patterns.not_data_symbolset[column_index]
+        case_summary = patterns.not_data_case[column_index]
+        length_summary = patterns.not_data_character_length[column_index]
+        all_numbers_summary = patterns.not_data_all_numbers[column_index]
+        disagreement_summary_strength = patterns.disagreement_summary_strength[
+            column_index
         ]
         ## REFACTORED
         repetitions_of_candidate = 0
         repetitions_of_neighbor = 0
         neighbor = ""
         if len(train_sig) > 0:
-            repetitions_of_candidate = not_data_patterns["candidate_count"][value]
+            repetitions_of_candidate = patterns.not_data_candidate_count[column_index][
+                value
+            ]
             if signatures_slice.all_normalized_values.shape[0] > 2:
                 neighbor = signatures_slice.all_normalized_values[2, column]
                 if neighbor != "":
-                    repetitions_of_neighbor = not_data_patterns["neighbor_count"][
+                    repetitions_of_neighbor = patterns.neighbor_count[column_index][
                         neighbor
                     ]
 
-        incoherent_cells[column][
-            "disagreement_summary_strength"
-        ] = disagreement_summary_strength
+        incoherent_cells[column].disagreement_summary_strength = (
+            disagreement_summary_strength
+        )
 
-        for rule in model.fuzzy_rules["cell"]["not_data"].keys():
-            rule_fired = False
-            if rule not in ignore_rules["cell"]["not_data"] and len(train_sig) > 0:
-                if disagreement_summary_strength > 0 and (
-                    all_numbers_summary == False or is_number == False
-                ):
-                    rule_fired = eval_not_data_cell_rule(
-                        rule,
-                        repetitions_of_candidate,
-                        repetitions_of_neighbor,
-                        neighbor,
-                        value_pattern_summary,
-                        value_pattern_BW_summary,
-                        value_chain_consistent,
-                        value_symbol_summary,
-                        case_summary,
-                        length_summary,
-                        train_sig,
-                        symbol_sig,
-                        case,
-                        num_chars_sig,
-                        disagreement_summary_strength,
-                        line_agreements,
-                        column,
-                        line_label,
-                    )
-                    if rule_fired == True:
-                        incoherent_cells[column]["disagreements"].append(rule)
+        if (
+            len(train_sig) > 0
+            and disagreement_summary_strength > 0
+            and (all_numbers_summary == False or is_number == False)
+        ):
+            incoherent_cells[column].disagreements = evaluate_not_data_rules(
+                incoherent_cells[column].disagreement_mask,
+                repetitions_of_candidate,
+                repetitions_of_neighbor,
+                neighbor,
+                value_pattern_summary,
+                value_pattern_BW_summary,
+                value_chain_consistent,
+                value_symbol_summary,
+                case_summary,
+                length_summary,
+                train_sig,
+                symbol_sig,
+                case,
+                num_chars_sig,
+                disagreement_summary_strength,
+                line_agreements,
+                column,
+                line_label,
+            )
 
     # Collect data line rules fired
     coherent_cells["all_summaries_empty"] = all_summaries_empty
+    coherent_cells["agreement_matrix"] = agreement_matrix
+    incoherent_cells["disagreement_matrix"] = disagreement_matrix
     line_agreements[line_label] = coherent_cells
     line_disagreements[line_label] = incoherent_cells
 
     return line_agreements, line_disagreements, patterns
 
 
+def data_cell_rule_key(
+    column_values,
+    value_pattern_summary,
+    value_chain_consistent,
+    value_pattern_BW_summary,
+    value_symbol_summary,
+    case_summary,
+    candidate_count,
+    partof_multiword_value_repeats,
+    candidate_tokens,
+    consistent_symbol_sets,
+    all_patterns_numeric,
+):
+    # everything eval_data_cell_rule reads, in hashable form
+    candidate = str(column_values[0]).strip().lower()
+    return (
+        candidate in pat_util.null_equivalent_values,
+        candidate in ["", " ", "nan", "None"],
+        len(column_values) > 2,
+        candidate_count,
+        sum([partof_multiword_value_repeats[t] for t in candidate_tokens]),
+        tuple(tuple(symbol) for symbol in value_pattern_summary),
+        value_chain_consistent,
+        tuple(tuple(symbol) for symbol in value_pattern_BW_summary),
+        tuple(value_symbol_summary),
+        case_summary,
+        consistent_symbol_sets,
+        all_patterns_numeric,
+    )
+
+
+def compile_rule_evaluator(
+    eval_rule, unit_class_fuzzy_rules, ignored_rules, rule_weights=None
+):
+    # Generates evaluate_rules(rule_mask, *features), which calls eval_rule
+    # once per active rule (in rule order) with the rule name inlined, sets
+    # the rule's position in rule_mask and returns the names of the rules fired.
+    # With rule_weights (as from rule_weight_array) only the rules with a weight
+    # are evaluated, heaviest first, up to the first one fired: the max_score
+    # of the cell is unchanged but the lighter rules it fires are not reported.
+    active_rules = [
+        (rule_index, rule)
+        for rule_index, rule in enumerate(unit_class_fuzzy_rules)
+        if rule not in ignored_rules
+    ]
+    if rule_weights is not None:
+        active_rules = sorted(
+            [
+                (rule_index, rule)
+                for rule_index, rule in active_rules
+                if rule_weights[rule_index] > 0
+            ],
+            key=lambda active_rule: -rule_weights[active_rule[0]],
+        )
+    source = ["def evaluate_rules(rule_mask, *features):", "    fired = []"]
+    for rule_index, rule in active_rules:
+        source.append(f"    if eval_rule({rule!r}, *features):")
+        source.append(f"        fired.append({rule!r})")
+        source.append(f"        rule_mask[{rule_index}] = 1")
+        if rule_weights is not None:
+            source.append("        return fired")
+    source.append("    return fired")
+    namespace = {"eval_rule": eval_rule}
+    exec("\n".join(source), namespace)
+    return namespace["evaluate_rules"]
+
+
 def non_empty_values(df_row):
-    last_idx = df_row.last_valid_index()
-    return df_row.loc[:last_idx].shape[0]
+    # width up to the last valid value, the whole row when there is none
+    valid_positions = np.flatnonzero(df_row.notna().to_numpy())
+    if len(valid_positions) == 0:
+        return df_row.shape[0]
+    return int(valid_positions[-1]) + 1
+
+
+def nonempty_window_end(nonempty_counts, start, strength, max_depth):
+    # end of the window from start through the strength-th non empty pattern
+    # of a column, None when max_depth lines from start do not hold that many
+    if strength < 1:
+        return None
+    counted_before = nonempty_counts[start - 1] if start > 0 else 0
+    position = np.searchsorted(nonempty_counts, counted_before + strength)
+    if position < min(len(nonempty_counts), start + max_depth):
+        return int(position) + 1
+    return None
+
+
+def remaining_occurrences(values):
+    # for every position, how often its value occurs from that position on
+    _, codes = np.unique(values, return_inverse=True)
+    group_sizes = np.bincount(codes)
+    group_starts = np.cumsum(group_sizes) - group_sizes
+    # a stable sort keeps the positions of each value in order
+    order = np.argsort(codes, kind="stable")
+    rank_in_group = np.empty(len(codes), dtype=np.intp)
+    rank_in_group[order] = np.arange(len(codes)) - group_starts[codes[order]]
+    return group_sizes[codes] - rank_in_group
+
+
+def normalized_value_flags(normalized_values):
+    # null equivalent (stripped and as is) and aggregate flags of every cell
+    normalized_values = np.asarray(normalized_values, dtype=object)
+    null_values = set(pat_util.null_equivalent_values)
+    aggregation_tokens = set(pat_util.aggregation_tokens)
+    lowered = [value.lower() for value in normalized_values.ravel().tolist()]
+    return tuple(
+        np.array(flags, dtype=bool).reshape(normalized_values.shape)
+        for flags in (
+            [value.strip() in null_values for value in lowered],
+            [value in null_values for value in lowered],
+            [not aggregation_tokens.isdisjoint(value.split()) for value in lowered],
+        )
+    )
+
+
+def label_positions(sorted_labels, labels):
+    # positions of labels in sorted_labels, -1 for the labels not in it
+    positions = np.searchsorted(sorted_labels, labels)
+    found = positions < len(sorted_labels)
+    found[found] = sorted_labels[positions[found]] == labels[found]
+    return np.where(found, positions, -1)
 
 
 def pythonify(json_data):
@@ -4261,124 +4639,127 @@ def get_class_confidences(
     parameters,
 ):
     # print('\n\n---> [METHOD] pat.get_class_confidences>>\n')
-    data_line_confidences = dict()
-    not_data_line_confidences = dict()
-    label_confidences = dict()
+
+    data_line_weights = line_rule_weights(
+        fuzzy_rules["line"]["data"], parameters.weight_lower_bound
+    )
+    not_data_line_weights = not_data_line_event_weights(
+        fuzzy_rules["line"]["not_data"], parameters.not_data_weight_lower_bound
+    )
+    use_line_weights = parameters.weight_input == "values_and_lines"
 
     column_indexes = file_dataframe_trimmed.columns
+    multiple_columns = file_dataframe_trimmed.shape[1] > 1
     # print(f'column_indexes={column_indexes}')
+
+    # scratch buffers for the cell scores and line weights of a row, the line
+    # rules fired on a row are a subset of the line rules
+    data_evidence = np.empty(len(column_indexes) + len(fuzzy_rules["line"]["data"]))
+    not_data_evidence = np.empty(
+        len(column_indexes) + len(fuzzy_rules["line"]["not_data"])
+    )
+
+    evidence = DataframeEvidence(
+        data_rules_fired,
+        not_data_rules_fired,
+        file_dataframe_trimmed.index,
+        column_indexes,
+        fuzzy_rules,
+    )
+    n_columns = len(column_indexes)
+    data_cell_scores = masked_max_scores(
+        evidence.agreements.reshape(-1, len(fuzzy_rules["cell"]["data"])),
+        rule_weight_array(fuzzy_rules["cell"]["data"], parameters.weight_lower_bound),
+    ).reshape(-1, n_columns)
+    not_data_cell_scores = masked_max_scores(
+        evidence.disagreements.reshape(-1, len(fuzzy_rules["cell"]["not_data"])),
+        rule_weight_array(
+            fuzzy_rules["cell"]["not_data"], parameters.not_data_weight_lower_bound
+        ),
+    ).reshape(-1, n_columns)
+    summary_strength = evidence.summary_strength
+    disagreement_summary_strength = evidence.disagreement_summary_strength
+    if parameters.summary_population_factor:
+        data_cell_scores = data_cell_scores * population_weights(
+            parameters.p, summary_strength
+        )
+        not_data_cell_scores = not_data_cell_scores * population_weights(
+            parameters.p, disagreement_summary_strength
+        )
+    null_equivalent = evidence.null_equivalent
+    aggregate = evidence.aggregate
+    row_labels = np.asarray(file_dataframe_trimmed.index)
+    # positions of the lines one and two lines up, -1 when not in the frame
+    previous_positions = label_positions(row_labels, row_labels - 1)
+    second_previous_positions = label_positions(row_labels, row_labels - 2)
+    # DATA and NOT-DATA confidence of every row, by row position
+    line_confidences = np.empty((len(row_labels), 2))
+    is_data_line = np.zeros(len(row_labels), dtype=bool)
+    impute_nulls = parameters.impute_nulls == True
+
     before_data = True
     offset = file_dataframe_trimmed.index[0]
-    for row_index in file_dataframe_trimmed.index:
+    for row_position, row_index in enumerate(file_dataframe_trimmed.index):
 
         # if offset+parameters.max_candidates<row_index:
         #     break
 
-        label_confidences[row_index] = dict()
-        candidate_row_agreements = list()
-        candidate_row_disagreements = list()
+        data_evidence_size = 0
+        not_data_evidence_size = 0
+
+        # whether the two lines before this one were classified as data is
+        # the same for every cell of the line
+        previous_position = previous_positions[row_position]
+        second_previous_position = second_previous_positions[row_position]
+        previous_is_data = previous_position >= 0 and is_data_line[previous_position]
+        second_previous_is_data = (
+            second_previous_position >= 0 and is_data_line[second_previous_position]
+        )
+        impute_from_previous = impute_nulls and previous_is_data
 
-        for column_index in column_indexes:
+        for column_index in range(n_columns):
             #############################################################################
             #  DATA value classification
-            value_agreements = data_rules_fired[row_index][column_index]["agreements"]
-            summary_strength = data_rules_fired[row_index][column_index][
-                "summary_strength"
-            ]
+            source_position = row_position
 
             # if there are no lines below me to check agreement,
             # and line before me exists and was data
             # see impute agreements
 
-            if (
-                (
-                    row_index in data_rules_fired.keys()
-                    and data_rules_fired[row_index][column_index]["null_equivalent"]
-                    == True
-                    or data_rules_fired[row_index][column_index]["summary_strength"]
-                    == 1
-                )
-                and parameters.impute_nulls == True
-                and row_index - 1 in data_rules_fired.keys()
-                and column_index in data_rules_fired[row_index - 1].keys()
-                and row_index - 1 in data_line_confidences.keys()
-                and data_line_confidences[row_index - 1]
-                > not_data_line_confidences[row_index - 1]
+            if impute_from_previous and (
+                null_equivalent[row_position, column_index]
+                or summary_strength[row_position, column_index] == 1
             ):
-                value_agreements = data_rules_fired[row_index - 1][column_index][
-                    "agreements"
-                ]
-                summary_strength = data_rules_fired[row_index - 1][column_index][
-                    "summary_strength"
-                ]
+                source_position = previous_position
             if (
-                row_index in data_rules_fired.keys()
-                and data_rules_fired[row_index][column_index]["summary_strength"] == 0
-                and data_rules_fired[row_index][column_index]["aggregate"]
-                and row_index - 2 in data_rules_fired.keys()
-                and column_index in data_rules_fired[row_index - 2].keys()
-                and row_index - 2 in data_line_confidences.keys()
-                and data_line_confidences[row_index - 2]
-                > not_data_line_confidences[row_index - 2]
+                second_previous_is_data
+                and summary_strength[row_position, column_index] == 0
+                and aggregate[row_position, column_index]
             ):
-                value_agreements = data_rules_fired[row_index - 2][column_index][
-                    "agreements"
-                ]
-                summary_strength = data_rules_fired[row_index - 2][column_index][
-                    "summary_strength"
-                ]
+                source_position = second_previous_position
 
             # otherwise, nothing was wrong, i can use my own damn agreements as initialized
-            data_score = max_score(
-                value_agreements,
-                fuzzy_rules["cell"]["data"],
-                parameters.weight_lower_bound,
-            )
-            POPULATION_WEIGHT = 1 - (1 - parameters.p) ** (2 * summary_strength)
-            if data_score != None:
-                if parameters.summary_population_factor:
-                    candidate_row_agreements.append(data_score * POPULATION_WEIGHT)
-                else:
-                    candidate_row_agreements.append(data_score)
+            data_score = data_cell_scores[source_position, column_index]
+            # zero evidence leaves the probabilistic sum unchanged
+            if data_score > 0:
+                data_evidence[data_evidence_size] = data_score
+                data_evidence_size += 1
 
             #######################################################################v######
             #  NOT DATA value classification
-            value_disagreements = not_data_rules_fired[row_index][column_index][
-                "disagreements"
-            ]
-            disagreement_summary_strength = not_data_rules_fired[row_index][
-                column_index
-            ]["disagreement_summary_strength"]
-            not_data_score = max_score(
-                value_disagreements,
-                fuzzy_rules["cell"]["not_data"],
-                parameters.not_data_weight_lower_bound,
-            )
-            POPULATION_WEIGHT = 1 - (1 - parameters.p) ** (
-                2 * disagreement_summary_strength
-            )
-
-            if not_data_score != None:
-                if parameters.summary_population_factor:
-                    candidate_row_disagreements.append(
-                        not_data_score * POPULATION_WEIGHT
-                    )
-                else:
-                    candidate_row_disagreements.append(not_data_score)
+            not_data_score = not_data_cell_scores[row_position, column_index]
+            if not_data_score > 0:
+                not_data_evidence[not_data_evidence_size] = not_data_score
+                not_data_evidence_size += 1
 
             ########################################################################
 
         #################################################################################
         # NOT DATA line weights
-        line_not_data_evidence = [score for score in candidate_row_disagreements]
-        if parameters.weight_input == "values_and_lines":
-            if (
-                row_index - 1 in data_line_confidences.keys()
-                and data_line_confidences[row_index - 1]
-                > not_data_line_confidences[row_index - 1]
-            ):
+        if use_line_weights:
+            if previous_is_data:
                 before_data = False
-            if file_dataframe_trimmed.shape[1] > 1:
+            if multiple_columns:
                 not_data_line_rules_fired = not_data_rules_fired[row_index]["line"]
                 for event in not_data_line_rules_fired:
                     if (
@@ -4386,80 +4767,142 @@ def get_class_confidences(
                         and before_data == False
                     ):
                         continue
-                    if (
-                        event.startswith("ADJACENT_ARITHMETIC_SEQUENCE")
-                        and fuzzy_rules["line"]["not_data"][event]["weight"] == None
-                    ):
-                        steps = event[-1]
-                        if steps.isdigit() and int(steps) in range(2, 6):
-                            event = event[:-1] + str(int(steps) + 1)
-                    if (
-                        event in fuzzy_rules["line"]["not_data"].keys()
-                        and fuzzy_rules["line"]["not_data"][event]["weight"] != None
-                        and fuzzy_rules["line"]["not_data"][event]["weight"]
-                        > parameters.not_data_weight_lower_bound
-                    ):
-                        line_not_data_evidence.append(
-                            fuzzy_rules["line"]["not_data"][event]["weight"]
-                        )
+                    weight = not_data_line_weights.get(event)
+                    if weight != None:
+                        not_data_evidence[not_data_evidence_size] = weight
+                        not_data_evidence_size += 1
 
         # DATA line weights
-        line_is_data_evidence = [score for score in candidate_row_agreements]
-        if parameters.weight_input == "values_and_lines":
+        if use_line_weights:
             line_is_data_events = data_rules_fired[row_index]["line"]
             for rule in line_is_data_events:
-                if (
-                    fuzzy_rules["line"]["data"][rule]["weight"] != None
-                    and fuzzy_rules["line"]["data"][rule]["weight"]
-                    > parameters.weight_lower_bound
-                ):
-                    line_is_data_evidence.append(
-                        fuzzy_rules["line"]["data"][rule]["weight"]
-                    )
+                weight = data_line_weights.get(rule)
+                if weight != None:
+                    data_evidence[data_evidence_size] = weight
+                    data_evidence_size += 1
 
         # calculate confidence that this row is data
-        data_conf = probabilistic_sum(line_is_data_evidence)
-        data_line_confidences[row_index] = data_conf
+        line_confidences[row_position, 0] = probabilistic_sum_buffer(
+            data_evidence, data_evidence_size
+        )
 
         # calculate confidence that this row is not data
-        not_data_conf = probabilistic_sum(line_not_data_evidence)
-        not_data_line_confidences[row_index] = not_data_conf
-
-        label_confidences[row_index]["DATA"] = data_conf
-        label_confidences[row_index]["NOT-DATA"] = not_data_conf
+        line_confidences[row_position, 1] = probabilistic_sum_buffer(
+            not_data_evidence, not_data_evidence_size
+        )
+        is_data_line[row_position] = (
+            line_confidences[row_position, 0] > line_confidences[row_position, 1]
+        )
 
+    data_line_confidences = dict(
+        zip(file_dataframe_trimmed.index, line_confidences[:, 0].tolist())
+    )
+    not_data_line_confidences = dict(
+        zip(file_dataframe_trimmed.index, line_confidences[:, 1].tolist())
+    )
     return data_line_confidences, not_data_line_confidences
 
 
 def max_score(events, unit_class_fuzzy_rules, weight_lower_bound):
-    if len(events) > 0:
-        event_score = []
-        for event in events:
-            if (
-                unit_class_fuzzy_rules[event]["weight"] != None
-                and unit_class_fuzzy_rules[event]["weight"] >= weight_lower_bound
-            ):
-                event_score.append((event, unit_class_fuzzy_rules[event]["weight"]))
-        if len(event_score) > 0:
-            event_score.sort(key=lambda x: x[1], reverse=True)
-            return event_score[0][1]
-        else:
-            return 0
-    else:
+    # highest weight among the events that pass the lower bound, 0 if none do
+    top_weight = None
+    for event in events:
+        weight = unit_class_fuzzy_rules[event]["weight"]
+        if (
+            weight != None
+            and weight >= weight_lower_bound
+            and (top_weight == None or weight > top_weight)
+        ):
+            top_weight = weight
+    if top_weight == None:
         return 0
+    return top_weight
+
+
+def not_data_cell_score_bound(max_not_data_weight, disagreement_summary_strength, args):
+    # upper bound of a not data cell score, a column without disagreement
+    # strength gives a negative population weight and no not data rule fires,
+    # so the bound never drops below the score of no rules fired
+    bound = max_not_data_weight
+    if args.summary_population_factor:
+        bound = max_not_data_weight * (
+            1 - (1 - args.p) ** (2 * disagreement_summary_strength)
+        )
+    return max(bound, 0)
+
+
+def rule_weight_array(unit_class_fuzzy_rules, weight_lower_bound):
+    # weights in rule iteration order, zeroed where max_score would skip the rule
+    weights = np.zeros(len(unit_class_fuzzy_rules))
+    for rule_index, rule in enumerate(unit_class_fuzzy_rules.values()):
+        if rule["weight"] != None and rule["weight"] >= weight_lower_bound:
+            weights[rule_index] = rule["weight"]
+    return weights
+
+
+def max_rule_weight(rule_weights, rule_ids):
+    # max_score of the rules at rule_ids, rule_weights as from rule_weight_array
+    # most cells fire no rule or a single one, those skip the array indexing
+    if len(rule_ids) == 0:
+        return 0.0
+    if len(rule_ids) == 1:
+        return max(float(rule_weights[rule_ids[0]]), 0.0)
+    return float(rule_weights[rule_ids].max(initial=0))
+
+
+def line_rule_weights(unit_class_fuzzy_rules, weight_lower_bound):
+    # weights of the line rules that count as evidence, by rule name
+    return {
+        rule: rule_spec["weight"]
+        for rule, rule_spec in unit_class_fuzzy_rules.items()
+        if rule_spec["weight"] != None and rule_spec["weight"] > weight_lower_bound
+    }
+
+
+def not_data_line_event_weights(unit_class_fuzzy_rules, weight_lower_bound):
+    # line_rule_weights by event fired, an arithmetic sequence event without a
+    # weight takes the weight of the event it is rewritten to
+    weights = line_rule_weights(unit_class_fuzzy_rules, weight_lower_bound)
+    for event, rewritten in ADJACENT_ARITHMETIC_SEQUENCE_REWRITE.items():
+        if (
+            event in unit_class_fuzzy_rules
+            and unit_class_fuzzy_rules[event]["weight"] == None
+            and rewritten in weights
+        ):
+            weights[event] = weights[rewritten]
+    return weights
+
+
+def masked_max_scores(rule_matrix, rule_weights):
+    # max_score for every row of a [cell, rule position] matrix of rules fired
+    return (rule_weights * rule_matrix).max(axis=1, initial=0)
+
+
+def population_weights(p, summary_strengths):
+    # 1 - (1 - p)^(2 * summary_strength) of every cell, looked up in a table
+    # with the weight of each summary strength
+    summary_strengths = np.asarray(summary_strengths, dtype=np.intp)
+    if summary_strengths.size == 0:
+        return np.ones(summary_strengths.shape)
+    strengths = range(summary_strengths.max() + 1)
+    weights = np.array([1 - (1 - p) ** (2 * strength) for strength in strengths])
+    return weights[summary_strengths]
 
 
 # ALSO IN table_classifier_utilities, # TODO remove from there SAFELY
 def probabilistic_sum(line_scores):
     # product_form, demorgan, etc
-    predata_row_confidence = 0
-    if len(line_scores) > 0:
-        score_counts = {x: line_scores.count(x) for x in line_scores}
-        prod_list = []
-        for score, count in score_counts.items():
-            prod_list.append((1 - score) ** count)
-        predata_row_confidence = 1 - np.prod(prod_list)
-    return predata_row_confidence
+    scores = np.asarray(line_scores, dtype=np.float64)
+    if scores.size == 0:
+        return 0
+    if (scores >= 1).any():
+        return 1.0
+    return 1.0 - math.exp(np.log1p(-scores).sum())
+
+
+def probabilistic_sum_buffer(evidence_buffer, size):
+    # probabilistic_sum of the first size scores of a float64 buffer
+    return probabilistic_sum(evidence_buffer[:size])
 
 
 def process_csv_worker(task):
@@ -4497,19 +4940,18 @@ def process_csv_worker(task):
         all_csv_tuples = []
         if failure == None:
             try:
-                with codecs.open(filepath, "rU", encoding=discovered_encoding) as f:
-                    chunk = f.read()
-                    if chunk:
-                        for line in csv.reader(
-                            chunk.split("\n"),
-                            quotechar='"',
-                            delimiter=discovered_delimiter,
-                            skipinitialspace=True,
-                        ):
-                            num_lines += 1
-                            if len(line) == 0 or sum(len(s.strip()) for s in line) == 0:
-                                blanklines.append(num_lines - 1)
-                            all_csv_tuples.append(line)
+                with open(filepath, "r", encoding=discovered_encoding, newline="") as f:
+                    # stream the lines, the file is never held in memory whole
+                    for line in csv.reader(
+                        f,
+                        quotechar='"',
+                        delimiter=discovered_delimiter,
+                        skipinitialspace=True,
+                    ):
+                        num_lines += 1
+                        if not any(s.strip() for s in line):
+                            blanklines.append(num_lines - 1)
+                        all_csv_tuples.append(line)
                 file_dataframe = file_utilities.merged_df(failure, all_csv_tuples)
                 total_rows, total_columns = file_dataframe.shape
             except Exception as e:
@@ -4579,11 +5021,65 @@ def process_csv_worker(task):
         )
 
 
-def collect_dataframe_rules(csv_file, model, signatures):
+def process_pool_context():
+    # workers are started from a forkserver where available, so they do not
+    # inherit the threads of numerical libraries already running in the parent
+    start_method = None
+    if "forkserver" in get_all_start_methods():
+        start_method = "forkserver"
+    return get_context(start_method)
+
+
+_infer_worker_model = None
+
+
+def init_infer_worker(fuzzy_rules, ignore_rules, parameters, exact=True):
+    # every worker process rebuilds the model once from the rules of the parent
+    global _infer_worker_model
+    _infer_worker_model = PYTHEAS()
+    _infer_worker_model.fuzzy_rules = fuzzy_rules
+    _infer_worker_model.ignore_rules = ignore_rules
+    _infer_worker_model.parameters = parameters
+    _infer_worker_model.exact = exact
+
+
+def infer_annotations_worker(task):
+    filepath, max_lines = task
+    return filepath, _infer_worker_model.infer_annotations(filepath, max_lines)
+
+
+def infer_annotations_files(model, filepaths, max_lines=None, workers=None):
+    """Infers the annotations of every file in filepaths, keyed by filepath.
+
+    With more than one worker the files are annotated in a pool of worker
+    processes, started from process_pool_context, that each receive the rules
+    of the model once.
+    """
+    tasks = [(filepath, max_lines) for filepath in filepaths]
+    if workers is None or workers <= 1 or len(tasks) <= 1:
+        return {
+            filepath: model.infer_annotations(filepath, max_lines)
+            for filepath, max_lines in tasks
+        }
+    with process_pool_context().Pool(
+        processes=min(workers, len(tasks)),
+        initializer=init_infer_worker,
+        initargs=(model.fuzzy_rules, model.ignore_rules, model.parameters, model.exact),
+    ) as pool:
+        annotations = dict(pool.imap_unordered(infer_annotations_worker, tasks))
+    return {filepath: annotations[filepath] for filepath in filepaths}
+
+
+def collect_dataframe_rules(csv_file, model, signatures, exact=True):
 
     args = model.parameters
     fuzzy_rules = model.fuzzy_rules
     ignore_rules = model.ignore_rules
+    cell_rule_evaluators = model.cell_rule_evaluators(exact)
+    evaluate_data_rules = cell_rule_evaluators["data"]
+    evaluate_not_data_rules = cell_rule_evaluators["not_data"]
+    n_data_rules = len(fuzzy_rules["cell"]["data"])
+    n_not_data_rules = len(fuzzy_rules["cell"]["not_data"])
 
     dataframe_labels = []
     for column in csv_file:
@@ -4591,197 +5087,189 @@ def collect_dataframe_rules(csv_file, model, signatures):
 
     data_rules_fired = {}
     not_data_rules_fired = {}
-    row_counter = -1
-
-    for row in csv_file.itertuples():
-        line_index = row.Index
-        if len(row) > 1:
-            row = row[1:]
-        else:
-            row = []
-
-        row_values = [str(elem) if elem is not None else elem for elem in row]
-        null_equivalent_fired, times = line_has_null_equivalent(row_values)
 
-        data_rules_fired[line_index] = {}
-        row_counter += 1
-        all_summaries_empty = True  # initialize
+    # the raw values of every line, as the line rules of both passes read them
+    lines_values = {
+        line_index: [str(elem) if elem is not None else elem for elem in row]
+        for line_index, row in zip(csv_file.index, csv_file.to_numpy().tolist())
+    }
+    # running count of the non empty patterns down each column
+    nonempty_pattern_counts = np.ascontiguousarray(
+        (np.vectorize(len, otypes=[int])(signatures.all_column_train) > 0)
+        .cumsum(axis=0)
+        .T
+    )
+    last_line_index = csv_file.index[-1] if len(csv_file.index) > 0 else None
+    multiple_columns = csv_file.shape[1] > 1
+    # the data window of a line and the not data window of the line above it
+    # start on the same line and end on the same line, so the case and length
+    # summaries of the data pass are kept for the not data pass by
+    # (column, window start, window end)
+    window_summaries = {}
+
+    n_lines = len(signatures.all_normalized_values)
+    # how often each cell's value occurs in its column from its line down
+    value_occurrences = [
+        remaining_occurrences(signatures.all_normalized_values[:, column_index])
+        for column_index in range(len(csv_file.columns))
+    ]
 
-        n_lines = len(signatures.all_normalized_values)
-        patterns = Patterns()
-        for column_index, column in enumerate(csv_file.columns):
+    lines = list(lines_values.items())
+    # rules fired per [line position, column, rule position] for the whole frame,
+    # each line's matrix and each cell's mask are views into them
+    agreements = np.zeros((len(lines), len(csv_file.columns), n_data_rules), dtype=bool)
+    disagreements = np.zeros(
+        (len(lines), len(csv_file.columns), n_not_data_rules), dtype=bool
+    )
+    # the checks on the cell value alone, for the whole frame at once
+    (
+        null_equivalent_cells,
+        lower_null_equivalent_cells,
+        aggregate_cells,
+    ) = normalized_value_flags(signatures.all_normalized_values)
+    # the data line events of every line, the first two count its null equivalents
+    data_line_events = assess_data_lines([row_values for _, row_values in lines])
+    lines_with_null_equivalent = data_line_events[:, :2].any(axis=1)
+    # the line rules that are not ignored, in the order they are reported
+    line_data_ignore = frozenset(ignore_rules["line"]["data"])
+    line_data_rules = tuple(
+        rule for rule in fuzzy_rules["line"]["data"] if rule not in line_data_ignore
+    )
+    line_not_data_ignore = frozenset(ignore_rules["line"]["not_data"])
+    line_not_data_rules = tuple(
+        rule
+        for rule in fuzzy_rules["line"]["not_data"]
+        if rule not in line_not_data_ignore
+    )
 
-            data_rules_fired[line_index][column_index] = {}
-            data_rules_fired[line_index][column_index]["agreements"] = []
+    # the not data rules of a line read the data rules of the line below it, so
+    # the data rules of each line are collected one step ahead of its not data
+    # and line rules
+    for step in range(len(lines) + 1):
+        if step < len(lines):
+            line_index, row_values = lines[step]
+            null_equivalent_fired = lines_with_null_equivalent[step]
 
-            candidate_value = signatures.all_normalized_values[line_index, column_index]
-            value_lower = candidate_value.lower()
-            value_tokens = value_lower.split()
+            data_rules_fired[line_index] = {}
+            all_summaries_empty = True  # initialize
 
-            is_aggregate = len(value_tokens) > 0 and not set(value_tokens).isdisjoint(
-                pat_util.aggregation_tokens
-            )
-            is_null_equivalent = (
-                candidate_value.strip().lower() in pat_util.null_equivalent_values
-            )
+            agreement_matrix = agreements[step]
+            patterns = Patterns(len(csv_file.columns))
+            for column_index, column in enumerate(csv_file.columns):
 
-            data_rules_fired[line_index][column_index][
-                "null_equivalent"
-            ] = is_null_equivalent
-            data_rules_fired[line_index][column_index]["aggregate"] = is_aggregate
+                data_rules_fired[line_index][column_index] = CellEvidence()
+                data_rules_fired[line_index][
+                    column_index
+                ].agreement_mask = agreement_matrix[column_index]
 
-            column_train_sigs = None
-            column_symbols = None
-            column_cases = None
-            column_lengths = None
-            column_tokens = None
+                candidate_value = signatures.all_normalized_values[
+                    line_index, column_index
+                ]
 
-            # we need a context window with up to args.max_summary_strength non empty values to generate a context pattern
-            if args.max_summary_strength != None:
-                nonempty_patterns = 0
-                nonempty_patterns_idx = 0
-                for nonempty_patterns_idx in range(
-                    0, min(n_lines - line_index, args.max_line_depth)
-                ):
-                    if (
-                        len(
-                            signatures.all_column_train[
-                                line_index + nonempty_patterns_idx, column_index
-                            ]
-                        )
-                        > 0
-                    ):
-                        nonempty_patterns += 1
-                        if nonempty_patterns == args.max_summary_strength:
-                            column_train_sigs = signatures.all_column_train[
-                                line_index : line_index + nonempty_patterns_idx + 1,
-                                column_index,
-                            ].tolist()
-                            column_bw_train_sigs = signatures.all_column_bw_train[
-                                line_index : line_index + nonempty_patterns_idx + 1,
-                                column_index,
-                            ].tolist()
-                            column_symbols = signatures.all_column_symbols[
-                                line_index : line_index + nonempty_patterns_idx + 1,
-                                column_index,
-                            ]
-                            column_cases = signatures.all_column_cases[
-                                line_index : line_index + nonempty_patterns_idx + 1,
-                                column_index,
-                            ]
-                            column_lengths = signatures.all_column_character_lengths[
-                                line_index : line_index + nonempty_patterns_idx + 1,
-                                column_index,
-                            ]
-                            column_tokens = signatures.all_column_tokens[
-                                line_index : line_index + nonempty_patterns_idx + 1,
-                                column_index,
-                            ]
-                            column_values = signatures.all_normalized_values[
-                                line_index : line_index + nonempty_patterns_idx + 1,
-                                column_index,
-                            ]
-                            column_is_numeric_train = (
-                                signatures.all_column_is_numeric_train[
-                                    line_index : line_index + nonempty_patterns_idx + 1,
-                                    column_index,
-                                ]
-                            )
-                            break
+                data_rules_fired[line_index][column_index].null_equivalent = bool(
+                    null_equivalent_cells[line_index, column_index]
+                )
+                data_rules_fired[line_index][column_index].aggregate = bool(
+                    aggregate_cells[line_index, column_index]
+                )
 
-            if column_train_sigs == None:
-                column_train_sigs = signatures.all_column_train[
-                    line_index:, column_index
-                ].tolist()
+                # we need a context window with up to args.max_summary_strength non empty values to generate a context pattern
+                window_end = None
+                if args.max_summary_strength != None:
+                    window_end = nonempty_window_end(
+                        nonempty_pattern_counts[column_index],
+                        line_index,
+                        args.max_summary_strength,
+                        args.max_line_depth,
+                    )
+                window = slice(line_index, window_end)
+                column_train_sigs = signatures.all_column_train[window, column_index]
                 column_bw_train_sigs = signatures.all_column_bw_train[
-                    line_index:, column_index
-                ].tolist()
-                column_symbols = signatures.all_column_symbols[
-                    line_index:, column_index
+                    window, column_index
                 ]
-                column_cases = signatures.all_column_cases[line_index:, column_index]
+                column_symbols = signatures.all_column_symbols[window, column_index]
+                column_cases = signatures.all_column_cases[window, column_index]
                 column_lengths = signatures.all_column_character_lengths[
-                    line_index:, column_index
-                ]
-                column_tokens = signatures.all_column_tokens[line_index:, column_index]
-                column_values = signatures.all_normalized_values[
-                    line_index:, column_index
+                    window, column_index
                 ]
+                column_tokens = signatures.all_column_tokens[window, column_index]
+                column_values = signatures.all_normalized_values[window, column_index]
                 column_is_numeric_train = signatures.all_column_is_numeric_train[
-                    line_index:, column_index
+                    window, column_index
                 ]
 
-            candidate_tokens = set(
-                [t for t in column_tokens[0] if any(c.isalpha() for c in t)]
-            )
-
-            patterns.data_initialize(
-                column_index,
-                candidate_value,
-                candidate_tokens,
-                column_values,
-                column_tokens,
-                column_train_sigs,
-                column_bw_train_sigs,
-                column_symbols,
-                column_cases,
-                column_lengths,
-                column_is_numeric_train,
-                args.max_summary_strength,
-            )
+                candidate_tokens = signatures.alpha_tokens[line_index, column_index]
+
+                patterns.data_initialize(
+                    column_index,
+                    candidate_value,
+                    candidate_tokens,
+                    column_values,
+                    column_tokens,
+                    column_train_sigs,
+                    column_bw_train_sigs,
+                    column_symbols,
+                    column_cases,
+                    column_lengths,
+                    column_is_numeric_train,
+                    args.max_summary_strength,
+                )
 
-            # patterns of a window INCLUDING the cell we are on
-            data_patterns = patterns.data[column_index]
-            value_pattern_summary, value_chain_consistent = data_patterns["train"]
-            value_pattern_BW_summary, _ = data_patterns["bw_train"]
-            value_symbol_summary = data_patterns["symbolset"]
-            case_summary = data_patterns["case"]
-            length_summary = data_patterns["character_length"]
-            summary_strength = data_patterns["summary_strength"]
-            candidate_count_for_value = data_patterns["candidate_count"][
-                candidate_value
-            ]
-            partof_multiword_value_repeats = data_patterns[
-                "partof_multiword_value_repeats"
-            ]
-            consistent_symbol_sets, _ = data_patterns["consistent_symbol_sets"]
-            train_sigs_all_numeric, _ = data_patterns["column_is_numeric"]
-            data_rules_fired[line_index][column_index][
-                "summary_strength"
-            ] = summary_strength
+                # patterns of a window INCLUDING the cell we are on
+                value_pattern_summary, value_chain_consistent = patterns.train[
+                    column_index
+                ]
+                value_pattern_BW_summary, _ = patterns.bw_train[column_index]
+                value_symbol_summary = patterns.symbolset[column_index]
+                case_summary = patterns.case[column_index]
+                length_summary = patterns.character_length[column_index]
+                window_summaries[(column_index, line_index, window_end)] = (
+                    case_summary,
+                    length_summary,
+                )
+                summary_strength = patterns.summary_strength[column_index]
+                candidate_count_for_value = patterns.candidate_count[column_index][
+                    candidate_value
+                ]
+                partof_multiword_value_repeats = (
+                    patterns.partof_multiword_value_repeats[column_index]
+                )
+                consistent_symbol_sets, _ = patterns.consistent_symbol_sets[
+                    column_index
+                ]
+                train_sigs_all_numeric, _ = patterns.column_is_numeric[column_index]
+                data_rules_fired[line_index][
+                    column_index
+                ].summary_strength = summary_strength
 
-            if (
-                null_equivalent_fired == True
-                or len(value_pattern_summary) > 0
-                or len(value_pattern_BW_summary) > 0
-                or len(value_symbol_summary) > 0
-                or len(case_summary) > 0
-            ):
-                all_summaries_empty = False
+                if (
+                    null_equivalent_fired
+                    or len(value_pattern_summary) > 0
+                    or len(value_pattern_BW_summary) > 0
+                    or len(value_symbol_summary) > 0
+                    or len(case_summary) > 0
+                ):
+                    all_summaries_empty = False
 
-            for rule in fuzzy_rules["cell"]["data"].keys():
-                rule_fired = False
                 # Don't bother looking for agreements if there are no patterns or if the value on this line gives an empty pattern
-                non_empty_patterns = 0
-                # CHECK RULE
                 if (
-                    rule not in ignore_rules["cell"]["data"]
-                    and len(column_train_sigs) > 0
-                    and value_lower not in pat_util.null_equivalent_values
+                    len(column_train_sigs) > 0
+                    and not lower_null_equivalent_cells[line_index, column_index]
                 ):
-                    for pattern in column_train_sigs:
-                        if pattern != []:
-                            non_empty_patterns += 1
+                    # the non empty patterns of the window are its summary strength
+                    non_empty_patterns = summary_strength
 
                     # there is no point calculating agreement over one value, a single value always agrees with itself.
 
                     if (len(column_train_sigs) >= 2 and non_empty_patterns >= 2) or (
-                        len(csv_file.index) > 0 and line_index == csv_file.index[-1]
+                        line_index == last_line_index
                     ):  ### TEST CHANGE
                         assert len(column_values) > 0
 
-                        rule_fired = eval_data_cell_rule(
-                            rule,
+                        data_rules_fired[line_index][
+                            column_index
+                        ].agreements = evaluate_data_rules(
+                            agreement_matrix[column_index],
                             column_values,
                             column_tokens,
                             value_pattern_summary,
@@ -4798,128 +5286,57 @@ def collect_dataframe_rules(csv_file, model, signatures):
                             train_sigs_all_numeric,
                             candidate_tokens,
                         )
-                if rule_fired == True:
-                    data_rules_fired[line_index][column_index]["agreements"].append(
-                        rule
-                    )
-
-        data_rules_fired[line_index]["all_summaries_empty"] = all_summaries_empty
 
-    ##########################################################################################
-    ##########################################################################################
-    #################             EVALUATE NOT_DATA CELL RULES             ###################
-    ##########################################################################################
-    ##########################################################################################
-    # input('\nEVALUATE NOT_DATA CELL RULES')
+            data_rules_fired[line_index]["all_summaries_empty"] = all_summaries_empty
+            data_rules_fired[line_index]["agreement_matrix"] = agreement_matrix
 
-    row_counter = -1
-    for row in csv_file.itertuples():
-        line_index = row.Index
+        if step == 0:
+            continue
+        # evaluate the not data cell rules of the line above
+        line_index, row_values = lines[step - 1]
         not_data_rules_fired[line_index] = {}
-        if len(row) > 1:
-            row = row[1:]
-        else:
-            row = []
-        row_values = [str(elem) if elem is not None else elem for elem in row]
-
-        row_counter += 1
 
+        disagreement_matrix = disagreements[step - 1]
+        not_data_rules_fired[line_index]["disagreement_matrix"] = disagreement_matrix
         for columnindex, column in enumerate(csv_file.columns):
 
-            not_data_rules_fired[line_index][columnindex] = {}
-            not_data_rules_fired[line_index][columnindex]["disagreements"] = []
+            not_data_rules_fired[line_index][columnindex] = CellEvidence()
+            not_data_rules_fired[line_index][
+                columnindex
+            ].disagreement_mask = disagreement_matrix[columnindex]
             candidate_value = signatures.all_normalized_values[line_index, columnindex]
 
-            value_lower = candidate_value.lower()
-            value_tokens = value_lower.split()
-
-            column_train_sigs = None
-            column_symbols = None
-            column_cases = None
-            column_lengths = None
-
+            window_end = None
+            bw_window_end = None
             if args.max_summary_strength != None:
-                nonempty_patterns = 0
-                nonempty_patterns_idx = 0
-                for nonempty_patterns_idx in range(
-                    0, min(n_lines - (line_index + 1), args.max_line_depth)
-                ):
-                    if (
-                        len(
-                            signatures.all_column_train[
-                                line_index + 1 + nonempty_patterns_idx, columnindex
-                            ]
-                        )
-                        > 0
-                    ):
-                        nonempty_patterns += 1
-                        if nonempty_patterns == args.max_summary_strength:
-                            column_train_sigs = signatures.train_normalized_numbers[
-                                line_index
-                                + 1 : line_index
-                                + 1
-                                + nonempty_patterns_idx
-                                + 1,
-                                columnindex,
-                            ].tolist()
-                            column_bw_train_sigs = (
-                                signatures.bw_train_normalized_numbers[
-                                    line_index
-                                    + 1 : line_index
-                                    + nonempty_patterns_idx
-                                    + 1,
-                                    columnindex,
-                                ].tolist()
-                            )
-                            column_symbols = signatures.symbolset_normalized_numbers[
-                                line_index
-                                + 1 : line_index
-                                + 1
-                                + nonempty_patterns_idx
-                                + 1,
-                                columnindex,
-                            ]
-                            column_cases = signatures.all_column_cases[
-                                line_index
-                                + 1 : line_index
-                                + 1
-                                + nonempty_patterns_idx
-                                + 1,
-                                columnindex,
-                            ]
-                            column_lengths = signatures.all_column_character_lengths[
-                                line_index
-                                + 1 : line_index
-                                + 1
-                                + nonempty_patterns_idx
-                                + 1,
-                                columnindex,
-                            ]
-                            break
-
-            if column_train_sigs == None:
-                column_train_sigs = signatures.train_normalized_numbers[
-                    line_index + 1 :, columnindex
-                ].tolist()
-                column_bw_train_sigs = signatures.bw_train_normalized_numbers[
-                    line_index + 1 :, columnindex
-                ].tolist()
-                column_symbols = signatures.symbolset_normalized_numbers[
-                    line_index + 1 :, columnindex
-                ]
-                column_cases = signatures.all_column_cases[
-                    line_index + 1 :, columnindex
-                ]
-                column_lengths = signatures.all_column_character_lengths[
-                    line_index + 1 :, columnindex
-                ]
+                window_end = nonempty_window_end(
+                    nonempty_pattern_counts[columnindex],
+                    line_index + 1,
+                    args.max_summary_strength,
+                    args.max_line_depth,
+                )
+                if window_end != None:
+                    # the backward window stops one line short of the others
+                    bw_window_end = window_end - 1
+            window = slice(line_index + 1, window_end)
+            column_train_sigs = signatures.train_normalized_numbers[window, columnindex]
+            column_bw_train_sigs = signatures.bw_train_normalized_numbers[
+                line_index + 1 : bw_window_end, columnindex
+            ]
+            column_symbols = signatures.symbolset_normalized_numbers[
+                window, columnindex
+            ]
+            column_cases = signatures.all_column_cases[window, columnindex]
+            column_lengths = signatures.all_column_character_lengths[
+                window, columnindex
+            ]
 
             disagreement_summary_strength = sum(
                 1 for x in column_train_sigs if len(x) > 0
             )
-            not_data_rules_fired[line_index][column][
-                "disagreement_summary_strength"
-            ] = disagreement_summary_strength
+            not_data_rules_fired[line_index][
+                column
+            ].disagreement_summary_strength = disagreement_summary_strength
 
             cand_pattern = signatures.train_normalized_numbers[line_index, columnindex]
             cand_symbols = signatures.symbolset_normalized_numbers[
@@ -4938,70 +5355,67 @@ def collect_dataframe_rules(csv_file, model, signatures):
                 column_bw_train_sigs
             )
             value_symbol_summary = pat_util.generate_symbol_summary(column_symbols)
-            case_summary = pat_util.generate_case_summary(column_cases)
-            length_summary = pat_util.generate_length_summary(column_lengths)
+            window_key = (columnindex, line_index + 1, window_end)
+            if window_key in window_summaries:
+                case_summary, length_summary = window_summaries.pop(window_key)
+            else:
+                case_summary = pat_util.generate_case_summary(column_cases)
+                length_summary = pat_util.generate_length_summary(column_lengths)
 
             if len(cand_pattern) > 0:
-                columnvalues = signatures.all_normalized_values[
-                    line_index:, columnindex
-                ]
-                repetitions_of_candidate = (columnvalues[1:] == candidate_value).sum()
+                # repetitions below the candidate and below its neighbor
+                occurrences = value_occurrences[columnindex]
+                repetitions_of_candidate = int(occurrences[line_index]) - 1
                 neighbor = ""
-                try:
-                    neighbor = columnvalues[1]
-                    repetitions_of_neighbor = (columnvalues[2:] == neighbor).sum()
-                except:
-                    repetitions_of_neighbor = 0
+                repetitions_of_neighbor = 0
+                if line_index + 1 < n_lines:
+                    neighbor = signatures.all_normalized_values[
+                        line_index + 1, columnindex
+                    ]
+                    repetitions_of_neighbor = int(occurrences[line_index + 1]) - 1
 
-            for rule in fuzzy_rules["cell"]["not_data"].keys():
-                rule_fired = False
-                if (
-                    rule not in ignore_rules["cell"]["not_data"]
-                    and len(cand_pattern) > 0
-                ):
-                    if disagreement_summary_strength > 0 and (
-                        np.all(signatures.all_column_isnumber[line_index:, columnindex])
-                        == False
-                    ):
-                        rule_fired = eval_not_data_cell_rule(
-                            rule,
-                            repetitions_of_candidate,
-                            repetitions_of_neighbor,
-                            neighbor,
-                            value_pattern_summary,
-                            value_pattern_BW_summary,
-                            value_chain_consistent,
-                            value_symbol_summary,
-                            case_summary,
-                            length_summary,
-                            cand_pattern,
-                            cand_symbols,
-                            cand_case,
-                            cand_num_chars,
-                            disagreement_summary_strength,
-                            data_rules_fired,
-                            columnindex,
-                            line_index,
-                        )
-                        if rule_fired == True:
-                            not_data_rules_fired[line_index][columnindex][
-                                "disagreements"
-                            ].append(rule)
+            if (
+                len(cand_pattern) > 0
+                and disagreement_summary_strength > 0
+                and not np.all(signatures.all_column_isnumber[line_index:, columnindex])
+            ):
+                not_data_rules_fired[line_index][
+                    columnindex
+                ].disagreements = evaluate_not_data_rules(
+                    disagreement_matrix[columnindex],
+                    repetitions_of_candidate,
+                    repetitions_of_neighbor,
+                    neighbor,
+                    value_pattern_summary,
+                    value_pattern_BW_summary,
+                    value_chain_consistent,
+                    value_symbol_summary,
+                    case_summary,
+                    length_summary,
+                    cand_pattern,
+                    cand_symbols,
+                    cand_case,
+                    cand_num_chars,
+                    disagreement_summary_strength,
+                    data_rules_fired,
+                    columnindex,
+                    line_index,
+                )
         # end processing column
         ########################################################################
         #### COLLECT LINE RULES ####
 
         # 1. Collect data line rules fired
-        line_is_data_events = assess_data_line(row_values)
-        data_rules_fired[line_index]["line"] = []
+        line_is_data_events = {
+            event
+            for event, fired in zip(DATA_LINE_EVENTS, data_line_events[step - 1])
+            if fired
+        }
+        data_rules_fired[line_index]["line"] = [
+            rule for rule in line_data_rules if rule in line_is_data_events
+        ]
         not_data_rules_fired[line_index]["line"] = []
 
-        for rule in fuzzy_rules["line"]["data"].keys():
-            rule_fired = False
-            if rule not in ignore_rules["line"]["data"] and rule in line_is_data_events:
-                rule_fired = True
-                data_rules_fired[line_index]["line"].append(rule)
-
         # 2.  Collect not_data line rules fired
 
         # non_nulls,non_null_percentage = non_nulls_in_line(row_values)
@@ -5009,29 +5423,24 @@ def collect_dataframe_rules(csv_file, model, signatures):
         header_events_fired = collect_events_on_row(row_values)
         arithmetic_events_fired = collect_arithmetic_events_on_row(row_values)
 
-        arithmetic_sequence_fired = False
-        if len(arithmetic_events_fired) > 0:
-            arithmetic_sequence_fired = True
+        arithmetic_sequence_fired = bool(arithmetic_events_fired)
         header_row_with_aggregation_tokens_fired = header_row_with_aggregation_tokens(
             row_values, arithmetic_sequence_fired
         )
 
         before_data = True
         not_data_line_rules_fired = []
-        if csv_file.shape[1] > 1:
+        if multiple_columns:
             not_data_line_rules_fired = assess_non_data_line(
                 row_values, before_data, all_summaries_empty, line_index, csv_file
             )
 
-        for rule in fuzzy_rules["line"]["not_data"].keys():
-            rule_fired = False
-            if rule not in ignore_rules["line"]["not_data"] and rule in (
-                not_data_line_rules_fired
-                + header_events_fired
-                + arithmetic_events_fired
-                + header_row_with_aggregation_tokens_fired
-            ):
-                rule_fired = True
+        line_is_not_data_events = set(not_data_line_rules_fired)
+        line_is_not_data_events.update(header_events_fired)
+        line_is_not_data_events.update(arithmetic_events_fired)
+        line_is_not_data_events.update(header_row_with_aggregation_tokens_fired)
+        for rule in line_not_data_rules:
+            if rule in line_is_not_data_events:
                 not_data_rules_fired[line_index]["line"].append(rule)
 
     return data_rules_fired, not_data_rules_fired
@@ -5041,12 +5450,85 @@ def combined_table_confidence(top, bottom):
     return min(top, bottom)
 
 
+def combined_table_confidence_vec(top, bottom):
+    # combined_table_confidence of every table at once, picking top unless
+    # bottom is smaller as min does
+    top = np.asarray(top, dtype=np.float64)
+    bottom = np.asarray(bottom, dtype=np.float64)
+    return np.where(bottom < top, bottom, top)
+
+
+def csr_arrays(matrix):
+    # indptr and rule ids (indices) of the true entries of a boolean [row, rule]
+    # matrix, the ids fit in uint16 unless there are more than 65536 rules
+    _, indices = np.nonzero(matrix)
+    indptr = np.zeros(matrix.shape[0] + 1, dtype=np.int32)
+    np.cumsum(matrix.sum(axis=1), out=indptr[1:])
+    rule_id_type = np.uint16 if matrix.shape[1] <= 1 << 16 else np.int32
+    return {"indptr": indptr, "indices": indices.astype(rule_id_type)}
+
+
+def sparse_rules_fired(data_rules_fired, not_data_rules_fired, fuzzy_rules):
+    """
+    Returns the rules fired on a dataframe in compressed sparse row form, for each
+    of the data and not_data categories: the line indexes, the number of columns,
+    and the rule names with the indptr and indices of the cells (line by line,
+    then column by column) and of the lines that fired them. The indices are
+    rule ids into the rule names, as numpy arrays that save_json writes as lists
+    """
+    sparse = {}
+    for category, rules_fired, matrix_key in [
+        ("data", data_rules_fired, "agreement_matrix"),
+        ("not_data", not_data_rules_fired, "disagreement_matrix"),
+    ]:
+        cell_rules = list(fuzzy_rules["cell"][category])
+        line_rules = list(fuzzy_rules["line"][category])
+        rule_positions = {rule: position for position, rule in enumerate(line_rules)}
+        line_indexes = sorted(rules_fired)
+
+        n_columns = 0
+        cells = np.zeros((0, len(cell_rules)), dtype=bool)
+        if len(line_indexes) > 0:
+            n_columns = rules_fired[line_indexes[0]][matrix_key].shape[0]
+            cells = np.concatenate(
+                [rules_fired[line_index][matrix_key] for line_index in line_indexes]
+            )
+        lines = np.zeros((len(line_indexes), len(line_rules)), dtype=bool)
+        for line_position, line_index in enumerate(line_indexes):
+            for rule in rules_fired[line_index]["line"]:
+                lines[line_position, rule_positions[rule]] = True
+
+        sparse[category] = {
+            "lines": [int(line_index) for line_index in line_indexes],
+            "columns": n_columns,
+            "cell": dict(rules=cell_rules, **csr_arrays(cells)),
+            "line": dict(rules=line_rules, **csr_arrays(lines)),
+        }
+    return sparse
+
+
 def convert(o):
-    if isinstance(o, np.int64):
+    if isinstance(o, np.integer):
         return int(o)
+    if isinstance(o, np.ndarray):
+        return o.tolist()
     raise TypeError
 
 
+def save_json(obj, filepath):
+    # orjson is optional, it writes numpy values and non string keys itself
+    if _ORJSON_AVAILABLE:
+        with open(filepath, "wb") as outfile:
+            outfile.write(
+                orjson.dumps(
+                    obj, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+                )
+            )
+    else:
+        with open(filepath, "w") as outfile:
+            json.dump(obj, outfile, default=convert)
+
+
 if __name__ == "__main__":
 
     parser = argparse.ArgumentParser()
@@ -5058,6 +5540,12 @@ if __name__ == "__main__":
         "-f", "--filepath", default=None
     )  # , description="Filepath to CSV file over which to infer annotations")
     parser.add_argument("-o", "--output_file", default=None)
+    parser.add_argument(
+        "-n", "--workers", type=int, default=1
+    )  # , description="Worker processes annotating the files of a folder or glob")
+    parser.add_argument(
+        "--pypy", action="store_true"
+    )  # , description="Rerun the command under pypy3 when it is installed")
     parser.add_argument(
         "-c", "--csv_files", default=None
     )  # , description="Filepath to folder with CSV training files")
@@ -5066,24 +5554,48 @@ if __name__ == "__main__":
     )  # , description="Filepath to folder with JSON annotations over CSV training files")
 
     args = parser.parse_args(sys.argv[1:])
+    if args.pypy and sys.implementation.name != "pypy":
+        pypy = shutil.which("pypy3")
+        if pypy is None:
+            print("pypy3 not found, running under " + sys.implementation.name)
+        else:
+            # the rule loops are plain Python, PyPy's JIT runs them unchanged
+            pypy_command = [pypy, sys.argv[0]]
+            if __spec__ is not None:
+                pypy_command = [pypy, "-m", __spec__.name]
+            pypy_args = [arg for arg in sys.argv[1:] if arg != "--pypy"]
+            sys.exit(subprocess.call(pypy_command + pypy_args))
     command = args.command
     weights = args.weights
     filepath = args.filepath
     csv_files = args.csv_files
     annotations = args.annotations
     output_file = args.output_file
+    workers = args.workers
 
     if command == "infer":
         if weights is None or filepath is None:
             sys.exit()
         else:
-            Pytheas = API()
+            Pytheas = API(workers=workers)
             Pytheas.load_weights(weights)
-            infered_annotations = Pytheas.infer_annotations(filepath)
+            if os.path.isdir(filepath):
+                infered_annotations = Pytheas.infer_annotations_files(
+                    sorted(
+                        os.path.join(filepath, f)
+                        for f in listdir(filepath)
+                        if isfile(join(filepath, f))
+                    )
+                )
+            elif any(wildcard in filepath for wildcard in "*?["):
+                infered_annotations = Pytheas.infer_annotations_files(
+                    sorted(glob.glob(filepath))
+                )
+            else:
+                infered_annotations = Pytheas.infer_annotations(filepath)
             pp.pprint(infered_annotations)
             if output_file is not None:
-                with open(output_file, "w") as outfile:
-                    json.dump(infered_annotations, outfile, default=convert)
+                save_json(infered_annotations, output_file)
     elif command == "train":
         if csv_files is None or annotations is None or output_file is None:
             sys.exit()
@@ -186,13 +186,13 @@ def eval_not_data_cell_rule(
         ):
             next_line_agreements = line_agreements[line_index + 1]
             if columnindex in next_line_agreements.keys():
-                value_below_agreements = next_line_agreements[columnindex]["agreements"]
+                value_below_agreements = next_line_agreements[columnindex].agreements
                 if (
-                    line_agreements[line_index][columnindex]["null_equivalent"] == False
+                    line_agreements[line_index][columnindex].null_equivalent == False
                     and rule in value_below_agreements
                     and columnindex in line_agreements[line_index].keys()
                     and rule
-                    not in line_agreements[line_index][columnindex]["agreements"]
+                    not in line_agreements[line_index][columnindex].agreements
                 ):
                     rule_fired = True
 
@@ -204,13 +204,13 @@ def eval_not_data_cell_rule(
         ):
             next_line_agreements = line_agreements[line_index + 1]
             if columnindex in next_line_agreements.keys():
-                value_below_agreements = next_line_agreements[columnindex]["agreements"]
+                value_below_agreements = next_line_agreements[columnindex].agreements
                 if (
-                    line_agreements[line_index][columnindex]["null_equivalent"] == False
+                    line_agreements[line_index][columnindex].null_equivalent == False
                     and rule in value_below_agreements
                     and columnindex in line_agreements[line_index].keys()
                     and rule
-                    not in line_agreements[line_index][columnindex]["agreements"]
+                    not in line_agreements[line_index][columnindex].agreements
                 ):
                     rule_fired = True
 
@@ -222,13 +222,13 @@ def eval_not_data_cell_rule(
         ):
             next_line_agreements = line_agreements[line_index + 1]
             if columnindex in next_line_agreements.keys():
-                value_below_agreements = next_line_agreements[columnindex]["agreements"]
+                value_below_agreements = next_line_agreements[columnindex].agreements
                 if (
-                    line_agreements[line_index][columnindex]["null_equivalent"] == False
+                    line_agreements[line_index][columnindex].null_equivalent == False
                     and rule in value_below_agreements
                     and columnindex in line_agreements[line_index].keys()
                     and rule
-                    not in line_agreements[line_index][columnindex]["agreements"]
+                    not in line_agreements[line_index][columnindex].agreements
                 ):
                     rule_fired = True
 
@@ -240,13 +240,13 @@ def eval_not_data_cell_rule(
         ):
             next_line_agreements = line_agreements[line_index + 1]
             if columnindex in next_line_agreements.keys():
-                value_below_agreements = next_line_agreements[columnindex]["agreements"]
+                value_below_agreements = next_line_agreements[columnindex].agreements
                 if (
-                    line_agreements[line_index][columnindex]["null_equivalent"] == False
+                    line_agreements[line_index][columnindex].null_equivalent == False
                     and rule in value_below_agreements
                     and columnindex in line_agreements[line_index].keys()
                     and rule
-                    not in line_agreements[line_index][columnindex]["agreements"]
+                    not in line_agreements[line_index][columnindex].agreements
                 ):
                     rule_fired = True
 
@@ -258,13 +258,13 @@ def eval_not_data_cell_rule(
         ):
             next_line_agreements = line_agreements[line_index + 1]
             if columnindex in next_line_agreements.keys():
-                value_below_agreements = next_line_agreements[columnindex]["agreements"]
+                value_below_agreements = next_line_agreements[columnindex].agreements
                 if (
-                    line_agreements[line_index][columnindex]["null_equivalent"] == False
+                    line_agreements[line_index][columnindex].null_equivalent == False
                     and rule in value_below_agreements
                     and columnindex in line_agreements[line_index].keys()
                     and rule
-                    not in line_agreements[line_index][columnindex]["agreements"]
+                    not in line_agreements[line_index][columnindex].agreements
                 ):
                     rule_fired = True
 
@@ -276,13 +276,13 @@ def eval_not_data_cell_rule(
         ):
             next_line_agreements = line_agreements[line_index + 1]
             if columnindex in next_line_agreements.keys():
-                value_below_agreements = next_line_agreements[columnindex]["agreements"]
+                value_below_agreements = next_line_agreements[columnindex].agreements
                 if (
-                    line_agreements[line_index][columnindex]["null_equivalent"] == False
+                    line_agreements[line_index][columnindex].null_equivalent == False
                     and rule in value_below_agreements
                     and columnindex in line_agreements[line_index].keys()
                     and rule
-                    not in line_agreements[line_index][columnindex]["agreements"]
+                    not in line_agreements[line_index][columnindex].agreements
                 ):
                     rule_fired = True
 
@@ -294,13 +294,13 @@ def eval_not_data_cell_rule(
         ):
             next_line_agreements = line_agreements[line_index + 1]
             if columnindex in next_line_agreements.keys():
-                value_below_agreements = next_line_agreements[columnindex]["agreements"]
+                value_below_agreements = next_line_agreements[columnindex].agreements
                 if (
-                    line_agreements[line_index][columnindex]["null_equivalent"] == False
+                    line_agreements[line_index][columnindex].null_equivalent == False
                     and rule in value_below_agreements
                     and columnindex in line_agreements[line_index].keys()
                     and rule
-                    not in line_agreements[line_index][columnindex]["agreements"]
+                    not in line_agreements[line_index][columnindex].agreements
                 ):
                     rule_fired = True
 
@@ -312,13 +312,13 @@ def eval_not_data_cell_rule(
         ):
             next_line_agreements = line_agreements[line_index + 1]
             if columnindex in next_line_agreements.keys():
-                value_below_agreements = next_line_agreements[columnindex]["agreements"]
+                value_below_agreements = next_line_agreements[columnindex].agreements
                 if (
-                    line_agreements[line_index][columnindex]["null_equivalent"] == False
+                    line_agreements[line_index][columnindex].null_equivalent == False
                     and rule in value_below_agreements
                     and columnindex in line_agreements[line_index].keys()
                     and rule
-                    not in line_agreements[line_index][columnindex]["agreements"]
+                    not in line_agreements[line_index][columnindex].agreements
                 ):
                     rule_fired = True
 
@@ -330,13 +330,13 @@ def eval_not_data_cell_rule(
         ):
             next_line_agreements = line_agreements[line_index + 1]
             if columnindex in next_line_agreements.keys():
-                value_below_agreements = next_line_agreements[columnindex]["agreements"]
+                value_below_agreements = next_line_agreements[columnindex].agreements
                 if (
-                    line_agreements[line_index][columnindex]["null_equivalent"] == False
+                    line_agreements[line_index][columnindex].null_equivalent == False
                     and rule in value_below_agreements
                     and columnindex in line_agreements[line_index].keys()
                     and rule
-                    not in line_agreements[line_index][columnindex]["agreements"]
+                    not in line_agreements[line_index][columnindex].agreements
                 ):
                     rule_fired = True
 
@@ -348,13 +348,13 @@ def eval_not_data_cell_rule(
         ):
             next_line_agreements = line_agreements[line_index + 1]
             if columnindex in next_line_agreements.keys():
-                value_below_agreements = next_line_agreements[columnindex]["agreements"]
+                value_below_agreements = next_line_agreements[columnindex].agreements
                 if (
-                    line_agreements[line_index][columnindex]["null_equivalent"] == False
+                    line_agreements[line_index][columnindex].null_equivalent == False
                     and rule in value_below_agreements
                     and columnindex in line_agreements[line_index].keys()
                     and rule
-                    not in line_agreements[line_index][columnindex]["agreements"]
+                    not in line_agreements[line_index][columnindex].agreements
                 ):
                     rule_fired = True
 
@@ -668,7 +668,9 @@ def normalize_value(value):
                 break
 
     value = value.replace("'", "")
-    return value
+    # repeated values share one object, so comparisons and lookups on them
+    # short-circuit on identity
+    return sys.intern(value)
 
 
 def generate_case(value):
@@ -845,6 +847,10 @@ class TableSignatures:
             character_length = normalized_values.applymap(generate_character_length)
             case = normalized_values.applymap(generate_case)
             tokens = normalized_values.applymap(generate_tokens)
+            # the tokens with letters, the candidate tokens of the cell rules
+            alpha_tokens = tokens.applymap(
+                lambda cell: frozenset(t for t in cell if pat.has_alpha(t))
+            )
             token_length = tokens.applymap(generate_token_length)
             train = normalized_values.applymap(
                 lambda cell: generate_train(cell, outlier_sensitive)
@@ -878,6 +884,7 @@ class TableSignatures:
             self.all_column_character_lengths = character_length.to_numpy()
             self.all_column_cases = case.to_numpy()
             self.all_column_tokens = tokens.to_numpy()
+            self.alpha_tokens = alpha_tokens.to_numpy()
             self.all_column_token_lengths = token_length.to_numpy()
             self.all_column_train = train.to_numpy()
             self.all_column_bw_train = bw_train.to_numpy()
@@ -897,6 +904,7 @@ class TableSignatures:
             self.all_column_character_lengths = np.array([])
             self.all_column_cases = np.array([])
             self.all_column_tokens = np.array([])
+            self.alpha_tokens = np.array([])
             self.all_column_token_lengths = np.array([])
             self.all_column_train = np.array([])
             self.all_column_bw_train = np.array([])
@@ -953,6 +961,7 @@ class TableSignatures:
         ][::-1]
         slice.all_column_cases = self.all_column_cases[top : bottom + 1][::-1]
         slice.all_column_tokens = self.all_column_tokens[top : bottom + 1][::-1]
+        slice.alpha_tokens = self.alpha_tokens[top : bottom + 1][::-1]
         slice.all_column_token_lengths = self.all_column_token_lengths[
             top : bottom + 1
         ][::-1]
@@ -1892,22 +1901,42 @@ def aggregation_first_value_of_row(row_values):
     return fired
 
 
-def assess_data_line(row_values):
-    data_line_events = []
-    fired, times = line_has_null_equivalent(row_values)
-    if fired:
-        if times == 1:
-            data_line_events.append("ONE_NULL_EQUIVALENT_ON_LINE")
-        if times >= 2:
-            data_line_events.append("NULL_EQUIVALENT_ON_LINE_2_PLUS")
-
-    if aggregation_first_value_of_row(row_values):
-        data_line_events.append("AGGREGATION_TOKEN_IN_FIRST_VALUE_OF_ROW")
+# the events of assess_data_lines, in the order of its columns
+DATA_LINE_EVENTS = (
+    "ONE_NULL_EQUIVALENT_ON_LINE",
+    "NULL_EQUIVALENT_ON_LINE_2_PLUS",
+    "AGGREGATION_TOKEN_IN_FIRST_VALUE_OF_ROW",
+    "CONTAINS_DATATYPE_CELL_VALUE",
+)
+
+
+def assess_data_lines(rows):
+    """Data line events of a block of rows of equal length, as a [row, event]
+    boolean matrix with the events ordered as DATA_LINE_EVENTS."""
+    values = [[str(value).strip().lower() for value in row] for row in rows]
+    events = np.zeros((len(values), len(DATA_LINE_EVENTS)), dtype=bool)
+    if len(values) == 0 or len(values[0]) == 0:
+        return events
+    values = np.array(values, dtype=object)
+
+    null_equivalent_counts = np.isin(values, pat.strictly_null_equivalent).sum(axis=1)
+    events[:, 0] = null_equivalent_counts == 1
+    events[:, 1] = null_equivalent_counts >= 2
+    if values.shape[1] > 1:
+        for row_position in np.flatnonzero(
+            ["total" in first_value for first_value in values[:, 0]]
+        ):
+            events[row_position, 2] = any(
+                all(char.isdigit() or char in ". ," for char in value)
+                for value in values[row_position, 1:]
+            )
+        events[:, 3] = np.isin(values[:, 1:], pat.datatype_keywords).any(axis=1)
+    return events
 
-    if contains_datatype_keyword(row_values):
-        data_line_events.append("CONTAINS_DATATYPE_CELL_VALUE")
 
-    return data_line_events
+def assess_data_line(row_values):
+    events = assess_data_lines([list(row_values)])[0]
+    return [event for event, fired in zip(DATA_LINE_EVENTS, events) if fired]
 
 
 def contains_datatype_keyword(row_values):
@@ -2062,6 +2091,9 @@ def max_score(events, weights, weight_lower_bound):
         return 0
 
 
+NUMBER_SYMBOLS = frozenset(["D", " ", "S", "."])
+
+
 def all_numbers(column_symbols):
     for symbols in column_symbols:
         if len(symbols) == 0:
@@ -2072,7 +2104,7 @@ def all_numbers(column_symbols):
 
 
 def is_number(symbols):
-    if set(symbols) <= set(["D", " ", "S", "."]) and "D" in symbols:
+    if set(symbols) <= NUMBER_SYMBOLS and "D" in symbols:
         return True
     else:
         return False
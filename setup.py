@@ -23,6 +23,7 @@ setup(
         "tqdm>=4.36.1",
         "sortedcontainers>=2.1.0",
     ],
+    extras_require={"numba": ["numba>=0.53"], "orjson": ["orjson>=3.0"]},
     setup_requires=["pytest-runner"],
     tests_require=["pytest==4.4.1"],
     test_suite="tests",
@@ -0,0 +1,27 @@
+import unittest
+import pytheas.file_utilities as file_utilities
+
+
+class TestMergedDf(unittest.TestCase):
+    def test_last_line_of_different_width_is_kept(self):
+        all_csv_tuples = [
+            ["Year", "Count"],
+            ["2001", "100"],
+            [],
+            ["2002", "160"],
+            ["Total: 260"],
+        ]
+        dataframe = file_utilities.merged_df(None, all_csv_tuples)
+        self.assertEqual(dataframe.shape, (5, 2))
+        self.assertEqual(dataframe.loc[4, 0], "Total: 260")
+        self.assertTrue(dataframe.loc[2].isnull().all())
+        self.assertTrue(dataframe.isnull().loc[4, 1])
+
+    def test_one_line_file(self):
+        dataframe = file_utilities.merged_df(None, [["Year", "Count"]])
+        self.assertEqual(dataframe.shape, (1, 2))
+        self.assertEqual(dataframe.loc[0].tolist(), ["Year", "Count"])
+
+    def test_failure_gives_empty_frame(self):
+        dataframe = file_utilities.merged_df("failed", [["Year", "Count"]])
+        self.assertEqual(dataframe.shape, (0, 0))
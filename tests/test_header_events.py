@@ -0,0 +1,26 @@
+import unittest
+import pytheas.header_events as header_events
+
+
+class TestIntegerSequenceAdjacent(unittest.TestCase):
+    def test_kernel_matches_python_fallback(self):
+        rows = [
+            [],
+            ["1"],
+            ["1", "2001", "2002", "2003", "2004"],
+            ["1", "2001", "2004", "2002", "2003"],
+            ["1", "2001", "January", "2002", "January", "2003"],
+            ["3", "4", "x", "7", "8", "9", "10", "2"],
+            ["5", "6", "", "nan", "6", "7"],
+            ["99999999999999999999", "100000000000000000000", "1"],
+        ]
+        numba_available = header_events._NUMBA_AVAILABLE
+        try:
+            for row in rows:
+                header_events._NUMBA_AVAILABLE = True
+                fast = header_events.integer_sequence_adjacent(row)
+                header_events._NUMBA_AVAILABLE = False
+                slow = header_events.integer_sequence_adjacent(row)
+                self.assertEqual(fast, slow)
+        finally:
+            header_events._NUMBA_AVAILABLE = numba_available
@@ -1,7 +1,14 @@
+import glob
+import json
+import os
+import shutil
+import tempfile
 import unittest
+import numpy as np
 import pandas as pd
 import pprint
 from pytheas import pytheas
+import pytheas.file_utilities as file_utilities
 
 pp = pprint.PrettyPrinter(indent=4)
 
@@ -17,3 +24,168 @@ class TestPytheas(unittest.TestCase):
         max_lines = 100
         annotations = self.Pytheas.infer_annotations(filepath, max_lines)
         pp.pprint(annotations)
+
+
+class TestNotDataCellScoreBound(unittest.TestCase):
+    def test_zero_strength_column_keeps_zero_data_scores(self):
+        args = pytheas.PYTHEAS().parameters
+        args.summary_population_factor = True
+        # a column with summary strength 0 has disagreement strength -1
+        bound = pytheas.not_data_cell_score_bound(0.9, -1, args)
+        self.assertEqual(bound, 0)
+        cell_data_score = 0.0
+        self.assertFalse(cell_data_score > bound)
+
+    def test_bound_is_weighted_by_disagreement_strength(self):
+        args = pytheas.PYTHEAS().parameters
+        args.summary_population_factor = True
+        bound = pytheas.not_data_cell_score_bound(0.9, 2, args)
+        self.assertAlmostEqual(bound, 0.9 * (1 - (1 - args.p) ** 4))
+        args.summary_population_factor = False
+        self.assertEqual(pytheas.not_data_cell_score_bound(0.9, -1, args), 0.9)
+
+
+class TestInferAnnotationsFiles(unittest.TestCase):
+    def test_workers_give_the_same_annotations(self):
+        demo = os.path.join(
+            os.path.dirname(__file__), "..", "data", "examples", "demo.csv"
+        )
+        with tempfile.TemporaryDirectory() as folder:
+            shutil.copy(demo, os.path.join(folder, "demo.csv"))
+            with open(os.path.join(folder, "income.csv"), "w") as f:
+                f.write(
+                    "Table 2: Income,,,,\n"
+                    "Region,2016,2017,2018,2019\n"
+                    "North,100,110,120,130\n"
+                    "South,200,210,220,230\n"
+                    "East,300,310,320,330\n"
+                    "West,400,410,420,430\n"
+                    "Total,1000,1040,1080,1120\n"
+                    "Note: values in thousands,,,,\n"
+                )
+            filepaths = sorted(glob.glob(os.path.join(folder, "*.csv")))
+            serial = pytheas.API(workers=1).infer_annotations_files(filepaths)
+            pooled = pytheas.API(workers=2).infer_annotations_files(filepaths)
+        self.assertEqual(list(serial), filepaths)
+        for filepath in filepaths:
+            self.assertIsNotNone(serial[filepath])
+        self.assertEqual(serial, pooled)
+
+
+class TestDisagreementSummaryStrength(unittest.TestCase):
+    def test_strength_grows_with_the_window_below(self):
+        dataframe = pd.DataFrame([["a"], ["1"], [""], ["2"], ["3"]]).fillna("")
+        signatures = pytheas.TableSignatures(dataframe)
+        patterns = pytheas.Patterns(n_columns=1)
+        strengths = []
+        for line_label in range(1, dataframe.shape[0]):
+            signatures_slice = signatures.reverse_slice(top=0, bottom=line_label)
+            train_sig = signatures.train_normalized_numbers[line_label, 0]
+            patterns.update_not_data(0, train_sig, signatures_slice)
+            strengths.append(patterns.disagreement_summary_strength[0])
+            # the incremental strength is the one of a window summarized anew
+            fresh_patterns = pytheas.Patterns(n_columns=1)
+            fresh_patterns.update_not_data(0, train_sig, signatures_slice)
+            self.assertEqual(
+                strengths[-1], fresh_patterns.disagreement_summary_strength[0]
+            )
+        self.assertEqual(strengths, [1, 2, 2, 3])
+
+    def test_confidence_is_weighted_by_disagreement_strength(self):
+        model = pytheas.PYTHEAS()
+        model.load_default_weights()
+        parameters = model.parameters
+        fuzzy_rules = model.fuzzy_rules
+        not_data_weights = pytheas.rule_weight_array(
+            fuzzy_rules["cell"]["not_data"], parameters.not_data_weight_lower_bound
+        )
+        rule_index = int(np.argmax(not_data_weights))
+        dataframe = pd.DataFrame([["Total"], ["Note"], ["Source"]])
+
+        data_rules_fired = {}
+        not_data_rules_fired = {}
+        for line_label, strength in enumerate([2, 0, 1]):
+            data_rules_fired[line_label] = {
+                0: pytheas.CellEvidence(),
+                "agreement_matrix": np.zeros(
+                    (1, len(fuzzy_rules["cell"]["data"])), dtype=bool
+                ),
+                "line": [],
+            }
+            not_data_cell = pytheas.CellEvidence()
+            not_data_cell.disagreement_summary_strength = strength
+            disagreement_matrix = np.zeros(
+                (1, len(fuzzy_rules["cell"]["not_data"])), dtype=bool
+            )
+            disagreement_matrix[0, rule_index] = True
+            not_data_rules_fired[line_label] = {
+                0: not_data_cell,
+                "disagreement_matrix": disagreement_matrix,
+                "line": [],
+            }
+
+        data_confidences, not_data_confidences = pytheas.get_class_confidences(
+            dataframe, data_rules_fired, not_data_rules_fired, fuzzy_rules, parameters
+        )
+        weight = not_data_weights[rule_index]
+        self.assertEqual(data_confidences, {0: 0, 1: 0, 2: 0})
+        self.assertAlmostEqual(
+            not_data_confidences[0], weight * (1 - (1 - parameters.p) ** 4)
+        )
+        # a column without strength below the cell gives no evidence
+        self.assertEqual(not_data_confidences[1], 0)
+        self.assertAlmostEqual(
+            not_data_confidences[2], weight * (1 - (1 - parameters.p) ** 2)
+        )
+
+
+class TestSparseRulesFired(unittest.TestCase):
+    def expand(self, csr, n_rows):
+        # rule names of every row of a compressed sparse row block
+        return [
+            set(csr["rules"][rule_id] for rule_id in csr["indices"][start:end])
+            for start, end in zip(csr["indptr"][:n_rows], csr["indptr"][1:])
+        ]
+
+    def test_sparse_rules_match_the_dense_rules(self):
+        examples = os.path.join(os.path.dirname(__file__), "..", "data", "examples")
+        filepath = os.path.join(examples, "demo.csv")
+        model = pytheas.PYTHEAS()
+        model.load_default_weights()
+        result = model.rules_fired_in_file(
+            (0, filepath, os.path.join(examples, "demo.json"))
+        )
+        self.assertNotIsInstance(result, Exception)
+
+        file_dataframe = file_utilities.get_dataframe(filepath, 100)
+        signatures = pytheas.TableSignatures(
+            file_dataframe, model.parameters.outlier_sensitive
+        )
+        data_rules_fired, not_data_rules_fired = pytheas.collect_dataframe_rules(
+            file_dataframe, model, signatures
+        )
+        for sparse, rules_fired, cell_rules in [
+            (result[7], data_rules_fired, "agreements"),
+            (result[8], not_data_rules_fired, "disagreements"),
+        ]:
+            lines = sorted(rules_fired)
+            columns = list(range(file_dataframe.shape[1]))
+            self.assertEqual(sparse["lines"], lines)
+            self.assertEqual(sparse["columns"], len(columns))
+            self.assertEqual(sparse["cell"]["indices"].dtype, np.uint16)
+            cells = self.expand(sparse["cell"], len(lines) * len(columns))
+            line_rules = self.expand(sparse["line"], len(lines))
+            for line_position, line in enumerate(lines):
+                self.assertEqual(
+                    line_rules[line_position], set(rules_fired[line]["line"])
+                )
+                for column in columns:
+                    self.assertEqual(
+                        cells[line_position * len(columns) + column],
+                        set(getattr(rules_fired[line][column], cell_rules)),
+                    )
+            # the arrays are written as lists of the same rule ids
+            written = json.loads(json.dumps(sparse, default=pytheas.convert))
+            self.assertEqual(
+                written["cell"]["indices"], sparse["cell"]["indices"].tolist()
+            )
@@ -35,3 +35,29 @@ class TestTableClassifierUtilities(unittest.TestCase):
             print(
                 f'table_column_{column["table_column"]}={(" ".join([cell["value"] for cell in column["column_header"]])).strip()}'
             )
+
+
+class TestSymbolSetPredicates(unittest.TestCase):
+    def test_all_numbers(self):
+        self.assertTrue(table_util.all_numbers([]))
+        self.assertTrue(table_util.all_numbers([set(["D"]), set(), set(["D", "."])]))
+        self.assertTrue(table_util.all_numbers([set(["D", "S"]), set(["D", " "])]))
+        self.assertFalse(table_util.all_numbers([set(["D"]), set(["A"])]))
+        self.assertFalse(table_util.all_numbers([set(["S"])]))
+
+    def test_is_consistent_symbol_sets(self):
+        self.assertEqual(table_util.is_consistent_symbol_sets([]), (True, set()))
+        self.assertEqual(
+            table_util.is_consistent_symbol_sets([set(), set(["A", "-"]), set()]),
+            (True, set(["A", "-"])),
+        )
+        self.assertEqual(
+            table_util.is_consistent_symbol_sets([set(["A"]), set(["D"]), set()]),
+            (False, set()),
+        )
+        self.assertEqual(
+            table_util.is_consistent_symbol_sets(
+                [set(["A"]), set(["D"]), set(["A"])]
+            ),
+            (False, set(["A"])),
+        )